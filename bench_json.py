@@ -0,0 +1,29 @@
+import json
+import sys
+import timeit
+import pyairbnb.fastjson as fastjson
+
+# Compares the JSON backend used by pyairbnb with the standard library on a saved search result
+# usage: python bench_json.py [search_results.json] [repeat]
+
+path = sys.argv[1] if len(sys.argv) > 1 else "search_results.json"
+repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+with open(path, 'rb') as f:
+    raw = f.read()
+data = json.loads(raw)
+if fastjson.loads(raw) != data:
+    raise Exception("backends decode differently")
+
+cases = {
+    "loads": (lambda: json.loads(raw), lambda: fastjson.loads(raw)),
+    "dumps": (lambda: json.dumps(data), lambda: fastjson.dumps(data)),
+    "dumps per row": (lambda: [json.dumps(room) for room in data], lambda: [fastjson.dumps(room) for room in data]),
+    "dumps indented": (lambda: json.dumps(data, indent=4), lambda: fastjson.dumps(data, indent=True)),
+}
+
+print(f"{path}: {len(raw):,} bytes, {len(data)} rooms, backend {fastjson.backend}, {repeat} runs")
+for name, (stdlib, backend) in cases.items():
+    stdlib_time = min(timeit.repeat(stdlib, number=repeat, repeat=3)) / repeat
+    backend_time = min(timeit.repeat(backend, number=repeat, repeat=3)) / repeat
+    print(f"{name:15} json {stdlib_time*1000:8.3f}ms  {fastjson.backend} {backend_time*1000:8.3f}ms  x{stdlib_time/backend_time:.1f}")
@@ -0,0 +1,19 @@
+import sys
+import time
+import pyairbnb.parse as parse
+
+# Compares the fast detail page parser with the BeautifulSoup one on saved room pages
+# usage: python bench_parse.py room_page1.html room_page2.html ...
+
+for path in sys.argv[1:]:
+    with open(path, encoding="utf-8") as f:
+        body = f.read()
+    started_at = time.perf_counter()
+    fast = parse.find_deferred_state(body)
+    fast_time = time.perf_counter() - started_at
+    started_at = time.perf_counter()
+    soup = parse.find_deferred_state_soup(body)
+    soup_time = time.perf_counter() - started_at
+    if fast != soup:
+        raise Exception(f"{path}: fast parser output differs from BeautifulSoup")
+    print(f"{path}: identical, fast {fast_time*1000:.2f}ms, BeautifulSoup {soup_time*1000:.2f}ms")
@@ -0,0 +1,70 @@
+import sys
+import time
+import postgres_db
+
+# Size and scan time of the rooms table with raw_data inline (before) and with raw_data in a
+# separate payload table (after), on copies of the saved search results.
+# usage: python bench_postgres.py [results_folder] [copies]
+# The tables are temporary, the database of postgres_db.DB_CONFIG is left untouched.
+
+folder = sys.argv[1] if len(sys.argv) > 1 else "./results"
+copies = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+rooms = [room for file_path in postgres_db.find_json_files(folder) for room in postgres_db.iter_json_file(file_path) if room.get("room_id")]
+typed_columns = postgres_db.ROOM_COLUMNS[1:14]
+rows = []
+for copy in range(copies):
+    for idx, room in enumerate(rooms):
+        rows.append((copy * len(rooms) + idx,) + postgres_db.extract_room_fields(room) + (postgres_db.fastjson.dumps(room),))
+
+conn = postgres_db.connect_db()
+conn.autocommit = True
+cursor = conn.cursor()
+typed_definitions = """
+    room_id BIGINT PRIMARY KEY,
+    category VARCHAR(100),
+    kind VARCHAR(50),
+    name TEXT,
+    title TEXT,
+    type VARCHAR(50),
+    rating_value DECIMAL(3,2),
+    rating_review_count INTEGER,
+    price_amount DECIMAL(10,2),
+    price_qualifier VARCHAR(100),
+    price_currency_symbol VARCHAR(10),
+    latitude DECIMAL(11,8),
+    longitude DECIMAL(11,8),
+    badges TEXT[]
+"""
+cursor.execute(f"CREATE TEMP TABLE rooms_inline ({typed_definitions}, raw_data JSONB)")
+cursor.execute(f"CREATE TEMP TABLE rooms_hot ({typed_definitions})")
+cursor.execute("CREATE TEMP TABLE room_payloads_bench (room_id BIGINT PRIMARY KEY, raw_data JSONB)")
+postgres_db.copy_rows(cursor, "rooms_inline", ["room_id"] + typed_columns + ["raw_data"], rows)
+postgres_db.copy_rows(cursor, "rooms_hot", ["room_id"] + typed_columns, [row[:-1] for row in rows])
+postgres_db.copy_rows(cursor, "room_payloads_bench", ["room_id", "raw_data"], [(row[0], row[-1]) for row in rows])
+cursor.execute("VACUUM ANALYZE rooms_inline, rooms_hot, room_payloads_bench")
+
+def size(table):
+    cursor.execute("SELECT pg_relation_size(%s), pg_total_relation_size(%s)", (table, table))
+    return cursor.fetchone()
+
+def scan(table, repeat=5):
+    # a dashboard style aggregate, read from the table pages
+    query = f"SELECT category, count(*), avg(price_amount), avg(rating_value) FROM {table} GROUP BY category"
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(query)
+        cursor.fetchall()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+print(f"{len(rows)} rooms")
+for name, table in (("before: raw_data inline", "rooms_inline"), ("after: rooms table", "rooms_hot"), ("after: payload table", "room_payloads_bench")):
+    heap, total = size(table)
+    line = f"{name:25} heap {heap / 1024:9,.0f} kB  total {total / 1024:9,.0f} kB"
+    if table != "room_payloads_bench":
+        line += f"  scan {scan(table) * 1000:8.2f}ms"
+    print(line)
+conn.close()
@@ -0,0 +1,81 @@
+import sys
+import timeit
+import tracemalloc
+import pyairbnb.fastjson as fastjson
+import pyairbnb.standardize as standardize
+import pyairbnb.utils as utils
+
+# Per listing cost and memory of standardize.from_search, its columnar version and the nested path lookups.
+# usage: python bench_standardize.py [raw_search_results.json] [repeat]
+# Without a file of raw StaysSearch results, they are rebuilt from the shipped search_results.json.
+
+def to_raw(room: dict) -> dict:
+    unit = room["price"]["unit"]
+    symbol = unit.get("curency_symbol", "$")
+    return {
+        "__typename": "StaySearchResult",
+        "listing": {
+            "id": str(room["room_id"]),
+            "roomTypeCategory": room["category"],
+            "pdpUrlType": room["kind"],
+            "name": room["name"],
+            "title": room["title"],
+            "listingObjType": room["type"],
+            "coordinate": {"latitude": room["coordinates"]["latitude"], "longitude": room["coordinates"]["longitud"]},
+            "formattedBadges": [{"loggingContext": {"badgeType": badge}} for badge in room["badges"]],
+            "avgRatingLocalized": f'{room["rating"]["value"]} ({room["rating"]["reviewCount"]})' if room["rating"]["value"] else "New",
+            "contextualPictures": [{"picture": image["url"]} for image in room["images"]],
+        },
+        "pricingQuote": {"structuredStayDisplayPrice": {
+            "primaryLine": {"qualifier": unit.get("qualifier", ""), "price": f'{symbol}{unit.get("amount", 0):.0f}'},
+            "secondaryLine": {"price": f'{symbol}{unit.get("amount", 0):.0f} total'},
+            "explanationData": {"priceDetails": [{"items": [
+                {"description": item["description"], "priceString": f'{symbol}{item["amount"]:.0f}', "displayComponentType": "DEFAULT_EXPLANATION_LINE_ITEM"}
+                for item in room["price"]["break_down"]
+            ]}]},
+        }},
+    }
+
+path = sys.argv[1] if len(sys.argv) > 1 else ""
+repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+if path:
+    with open(path, 'rb') as f:
+        results = fastjson.load(f)
+else:
+    with open("search_results.json", 'rb') as f:
+        results = [to_raw(room) for room in fastjson.load(f)]
+
+total = min(timeit.repeat(lambda: standardize.from_search(results), number=repeat, repeat=3)) / repeat
+print(f"from_search: {len(results)} listings, {total / len(results) * 1e6:.2f}us per listing")
+
+def allocated(function) -> int:
+    tracemalloc.start()
+    kept = function()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+if hasattr(standardize, "from_search_columnar"):
+    total = min(timeit.repeat(lambda: standardize.from_search_columnar(results), number=repeat, repeat=3)) / repeat
+    print(f"from_search_columnar: {total / len(results) * 1e6:.2f}us per listing")
+    many = results * 100
+    print(f"memory per listing: from_search {allocated(lambda: standardize.from_search(many)) / len(many):.0f} bytes, "
+          f"from_search_columnar {allocated(lambda: standardize.from_search_columnar(many)) / len(many):.0f} bytes")
+
+if hasattr(utils, "NestedPath"):
+    listings = [result["listing"] for result in results]
+    key_paths = [("coordinate.latitude", 0), ("avgRatingLocalized", ""), ("formattedBadges", []), ("missing.key", "")]
+    compiled = [utils.NestedPath(key_path, default) for key_path, default in key_paths]
+    def legacy():
+        for listing in listings:
+            for key_path, default in key_paths:
+                utils.get_nested_value(listing, key_path, default)
+    def precompiled():
+        for listing in listings:
+            for nested_path in compiled:
+                nested_path(listing)
+    lookups = len(listings) * len(key_paths)
+    for name, function in (("get_nested_value", legacy), ("NestedPath", precompiled)):
+        elapsed = min(timeit.repeat(function, number=repeat, repeat=3)) / repeat
+        print(f"{name:17} {elapsed / lookups * 1e9:.0f}ns per lookup")
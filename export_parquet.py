@@ -0,0 +1,33 @@
+import os
+import re
+import sys
+from datetime import datetime
+import pyairbnb.fastjson as fastjson
+import pyairbnb.jsonl as jsonl
+import pyairbnb.parquet as parquet
+
+# Exports the search result snapshots of a folder to a Parquet dataset partitioned by crawl date and market
+# usage: python export_parquet.py <market> [results_folder] [dataset_folder]
+
+regex_timestamp = re.compile(r'(\d{8})_\d{6}')
+
+market = sys.argv[1]
+results_folder = sys.argv[2] if len(sys.argv) > 2 else "results"
+dataset_folder = sys.argv[3] if len(sys.argv) > 3 else "dataset/search"
+
+for name in sorted(os.listdir(results_folder)):
+    path = os.path.join(results_folder, name)
+    if jsonl.is_jsonl(path):
+        rooms = list(jsonl.read(path))
+    elif name.endswith(".json"):
+        with open(path, 'rb') as f:
+            rooms = fastjson.load(f)
+    else:
+        continue
+    match = regex_timestamp.search(name)
+    if match:
+        crawl_date = datetime.strptime(match.group(1), "%Y%m%d").date().isoformat()
+    else:
+        crawl_date = datetime.fromtimestamp(os.path.getmtime(path)).date().isoformat()
+    partition = parquet.export_search(rooms, dataset_folder, market, crawl_date)
+    print(f"{path}: {len(rooms)} listings -> {partition}")
@@ -1,8 +1,19 @@
 import psycopg2
-import json
+import pyairbnb.fastjson as fastjson
+import pyairbnb.jsonl as jsonl
+import psycopg2.errors
+import psycopg2.pool
+import psycopg2.extensions
 import os
+import io
 import glob
-from datetime import datetime
+import hashlib
+import random
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from psycopg2.extras import execute_values
 
 ## database connection parameters
 DB_CONFIG = {
@@ -13,6 +24,18 @@ DB_CONFIG = {
     "port": "5432"  
 }
 
+# Load files with COPY and set based merges (bulk_insert_room_data) instead of one statement per row
+BULK_LOAD = True
+
+# Records read from a file and written to the database at a time, files are never loaded whole
+BATCH_SIZE = 1000
+
+# Files loaded at the same time by process_json_files, each on its own pooled connection
+WORKERS = 4
+
+# Attempts of a file whose transaction is aborted by a deadlock with another file
+DEADLOCK_RETRIES = 3
+
 def test_database_connection():
     """Test database connection and basic operations"""
     print("Testing database connection...")
@@ -72,6 +95,8 @@ def find_json_files(folder_path):
         os.path.join(folder_path, "*.json"),
         os.path.join(folder_path, "**/*.json"),  # Recursive search
     ]
+    for extension in jsonl.extensions:
+        patterns.append(os.path.join(folder_path, f"**/*{extension}"))
     
     json_files = []
     for pattern in patterns:
@@ -86,6 +111,24 @@ def find_json_files(folder_path):
     
     return json_files
 
+def iter_json_file(file_path):
+    """Lazily read the records of a JSON array file or a JSON lines file"""
+    if jsonl.is_jsonl(file_path):
+        # newline delimited files written by pyairbnb.JsonlWriter, read record by record
+        return jsonl.read(file_path)
+    return jsonl.read_array(file_path)
+
+def iter_batches(records, batch_size=BATCH_SIZE):
+    """Group records into lists of at most batch_size records"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
 def load_json_file(file_path):
     """Load and validate JSON file"""
     try:
@@ -93,13 +136,7 @@ def load_json_file(file_path):
         file_size = os.path.getsize(file_path)
         print(f"File size: {file_size:,} bytes")
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            json_data = json.load(f)
-        
-        # Validate data structure
-        if not isinstance(json_data, list):
-            print(f"Warning: {file_path} - Expected list, got {type(json_data)}")
-            return None
+        json_data = list(iter_json_file(file_path))
         
         print(f"✓ Successfully loaded {len(json_data)} records from {file_path}")
         return json_data
@@ -107,15 +144,100 @@ def load_json_file(file_path):
     except FileNotFoundError:
         print(f"✗ File not found: {file_path}")
         return None
-    except json.JSONDecodeError as e:
+    except fastjson.JSONDecodeError as e:
         print(f"✗ Invalid JSON in {file_path}: {e}")
         return None
     except Exception as e:
         print(f"✗ Error loading {file_path}: {e}")
         return None
 
-def process_json_files(conn, folder_path):
-    """Process all JSON files in the folder"""
+def file_crawled_at(file_path):
+    """Crawl time of a result file, from the _YYYYMMDD_HHMMSS in its name (see test.py) or else its modification time"""
+    match = re.search(r"_(\d{8}_\d{6})", os.path.basename(file_path))
+    if match:
+        return datetime.strptime(match.group(1), "%Y%m%d_%H%M%S")
+    return datetime.fromtimestamp(os.path.getmtime(file_path))
+
+def stream_json_file(conn, file_path, bulk=BULK_LOAD, batch_size=BATCH_SIZE):
+    """
+    Load a file into the database batch by batch while it is read, memory stays bounded
+    by the batch size whatever the size of the file.
+    With bulk loading the whole file is one transaction.
+    Every room is also recorded in room_observations at the crawl time of the file, then the
+    daily rollups of the cells it observed are refreshed.
+    Returns the number of records read and the rooms inserted, updated and unchanged.
+    """
+    print(f"Streaming file: {file_path}")
+    print(f"File size: {os.path.getsize(file_path):,} bytes")
+    crawled_at = file_crawled_at(file_path)
+    ensure_partitions(conn, crawled_at)
+    
+    records = 0
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    try:
+        for batch in iter_batches(iter_json_file(file_path), batch_size):
+            records += len(batch)
+            if bulk:
+                batch_counts = bulk_insert_room_data(conn, batch, commit=False, crawled_at=crawled_at)
+            else:
+                batch_counts = insert_room_data(conn, batch, crawled_at=crawled_at)
+            for key in counts:
+                counts[key] += batch_counts[key]
+        refresh_rollups(conn, crawled_at)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return records, counts
+
+def load_file(conn, file_path, bulk=BULK_LOAD):
+    """
+    Load a file with stream_json_file. Files loaded in parallel can deadlock when they
+    share rooms, the file chosen as the victim is rolled back and loaded again.
+    """
+    for attempt in range(1, DEADLOCK_RETRIES + 1):
+        try:
+            return stream_json_file(conn, file_path, bulk)
+        except (psycopg2.errors.DeadlockDetected, psycopg2.errors.SerializationFailure) as e:
+            if attempt == DEADLOCK_RETRIES:
+                raise
+            print(f"Retrying {file_path} after {e.__class__.__name__} ({attempt}/{DEADLOCK_RETRIES})")
+            time.sleep(random.uniform(0.1, 0.5) * attempt)
+
+def load_file_pooled(connection_pool, file_path, bulk=BULK_LOAD):
+    """Load a file on a connection taken from the pool"""
+    conn = connection_pool.getconn()
+    try:
+        return load_file(conn, file_path, bulk)
+    finally:
+        connection_pool.putconn(conn)
+
+def load_files(conn, json_files, bulk=BULK_LOAD, workers=WORKERS):
+    """
+    Load files one after another on conn, or with workers > 1 several at once on the
+    connections of a pool.
+    Yields (file_path, result, error) as files complete, result is the one of stream_json_file.
+    """
+    if workers <= 1 or len(json_files) <= 1:
+        for file_path in json_files:
+            try:
+                yield file_path, load_file(conn, file_path, bulk), None
+            except Exception as e:
+                yield file_path, None, e
+        return
+    
+    connection_pool = psycopg2.pool.ThreadedConnectionPool(1, workers, **DB_CONFIG)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(load_file_pooled, connection_pool, file_path, bulk): file_path for file_path in json_files}
+            for future in as_completed(futures):
+                error = future.exception()
+                yield futures[future], None if error else future.result(), error
+    finally:
+        connection_pool.closeall()
+
+def process_json_files(conn, folder_path, bulk=BULK_LOAD, workers=WORKERS):
+    """Process all JSON files in the folder, the schema must be migrated first"""
     json_files = find_json_files(folder_path)
     
     if not json_files:
@@ -123,42 +245,36 @@ def process_json_files(conn, folder_path):
         return
     
     total_records = 0
+    totals = {"inserted": 0, "updated": 0, "unchanged": 0}
     successful_files = 0
     failed_files = []
     
+    if not bulk:
+        # the row by row loader rolls back its batch on any error, deadlocks included
+        workers = 1
+    
     print(f"\n{'='*60}")
-    print(f"PROCESSING {len(json_files)} JSON FILES")
+    print(f"PROCESSING {len(json_files)} JSON FILES WITH {max(workers, 1)} WORKERS")
     print(f"{'='*60}")
     
-    for idx, file_path in enumerate(json_files, 1):
-        print(f"\n[{idx}/{len(json_files)}] Processing: {os.path.basename(file_path)}")
+    for idx, (file_path, result, error) in enumerate(load_files(conn, json_files, bulk, workers), 1):
+        print(f"\n[{idx}/{len(json_files)}] {os.path.basename(file_path)}")
         print("-" * 50)
         
-        try:
-            # Load JSON data
-            json_data = load_json_file(file_path)
-            if json_data is None:
-                failed_files.append(file_path)
-                continue
-            
-            # Insert data into database
-            records_before = get_record_count(conn)
-            insert_json_data(conn, json_data, file_path)
-            records_after = get_record_count(conn)
-            
-            records_added = records_after - records_before
-            total_records += len(json_data)
-            successful_files += 1
-            
-            print(f"✓ File processed successfully!")
-            print(f"  Records in file: {len(json_data)}")
-            print(f"  Records added to DB: {records_added}")
-            print(f"  Total DB records: {records_after}")
-            
-        except Exception as e:
-            print(f"✗ Error processing {file_path}: {e}")
+        if error is not None:
+            print(f"✗ Error processing {file_path}: {error}")
             failed_files.append(file_path)
             continue
+        
+        records, counts = result
+        for key in totals:
+            totals[key] += counts[key]
+        total_records += records
+        successful_files += 1
+        
+        print(f"✓ File processed successfully!")
+        print(f"  Records in file: {records}")
+        print(f"  Rooms inserted: {counts['inserted']}, updated: {counts['updated']}, unchanged: {counts['unchanged']}")
     
     # Summary
     print(f"\n{'='*60}")
@@ -168,6 +284,7 @@ def process_json_files(conn, folder_path):
     print(f"Successfully processed: {successful_files}")
     print(f"Failed files: {len(failed_files)}")
     print(f"Total records processed: {total_records}")
+    print(f"Rooms inserted: {totals['inserted']}, updated: {totals['updated']}, unchanged: {totals['unchanged']}")
     
     if failed_files:
         print(f"\nFailed files:")
@@ -186,34 +303,49 @@ def get_record_count(conn):
     finally:
         cursor.close()
 
-def insert_json_data(conn, json_data, source_file=None):
-    cursor = conn.cursor()
-    create_tables(conn)
-    
-    # Debug: Check if json_data is loaded correctly
-    print(f"JSON data type: {type(json_data)}")
-    print(f"JSON data length: {len(json_data) if isinstance(json_data, list) else 'Not a list'}")
-    
+def insert_json_data(conn, json_data, source_file=None, bulk=False, crawled_at=None):
+    """Load a list of rooms as a crawl made now, or at crawled_at, in one transaction"""
     if source_file:
         print(f"Source file: {source_file}")
+    print(f"Records to insert: {len(json_data)}")
     
-    # Print first item to see structure
-    if isinstance(json_data, list) and len(json_data) > 0:
-        print(f"First item keys: {json_data[0].keys() if isinstance(json_data[0], dict) else 'Not a dict'}")
-        print(f"First item sample: {str(json_data[0])[:500]}...")
-    
-    insert_room_data(conn, json_data)
-    cursor.close()
+    crawled_at = crawled_at or datetime.now()
+    ensure_partitions(conn, crawled_at)
+    try:
+        if bulk:
+            counts = bulk_insert_room_data(conn, json_data, commit=False, crawled_at=crawled_at)
+        else:
+            counts = insert_room_data(conn, json_data, crawled_at=crawled_at)
+        refresh_rollups(conn, crawled_at)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return counts
 
-def create_tables(conn):
-    """Create tables for Airbnb data - only if they don't exist"""
+def get_raw_data(conn, room_id, crawled_at=None):
+    """Raw JSON of a room as of a crawl, the latest one when crawled_at is None"""
     cursor = conn.cursor()
-    
     try:
+        cursor.execute("""
+            SELECT raw_data FROM room_payloads
+            WHERE room_id = %(room_id)s AND (%(crawled_at)s::timestamp IS NULL OR crawled_at <= %(crawled_at)s)
+            ORDER BY crawled_at DESC
+            LIMIT 1
+        """, {"room_id": room_id, "crawled_at": crawled_at})
+        row = cursor.fetchone()
+        return row[0] if row else None
+    finally:
+        cursor.close()
+
+# Schema changes, applied in order by migrate and recorded in schema_version.
+# Never edit an applied migration, add a new version instead.
+MIGRATIONS = [
+    (1, "Create the rooms, images, price breakdown and file log tables", [
         # FIXED: Changed latitude and longitude precision
         # From DECIMAL(10,8) to DECIMAL(11,8) - allows for 3 digits before decimal
         # This supports coordinates like -180.12345678 to 180.12345678
-        create_rooms_table = """
+        """
         CREATE TABLE IF NOT EXISTS airbnb_rooms (
             id SERIAL PRIMARY KEY,
             room_id BIGINT UNIQUE NOT NULL,
@@ -233,10 +365,9 @@ def create_tables(conn):
             raw_data JSONB,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
-        """
-        
+        """,
         # Images table (normalized)
-        create_images_table = """
+        """
         CREATE TABLE IF NOT EXISTS room_images (
             id SERIAL PRIMARY KEY,
             room_id BIGINT REFERENCES airbnb_rooms(room_id),
@@ -244,10 +375,9 @@ def create_tables(conn):
             image_order INTEGER,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
-        """
-        
+        """,
         # Price breakdown table (normalized)
-        create_price_breakdown_table = """
+        """
         CREATE TABLE IF NOT EXISTS price_breakdown (
             id SERIAL PRIMARY KEY,
             room_id BIGINT REFERENCES airbnb_rooms(room_id),
@@ -256,10 +386,9 @@ def create_tables(conn):
             currency VARCHAR(10),
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
-        """
-        
+        """,
         # File processing log table
-        create_file_log_table = """
+        """
         CREATE TABLE IF NOT EXISTS file_processing_log (
             id SERIAL PRIMARY KEY,
             file_path TEXT NOT NULL,
@@ -270,65 +399,369 @@ def create_tables(conn):
             error_message TEXT,
             processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         );
+        """,
+    ]),
+    (2, "Add source_file and updated_at to airbnb_rooms", [
+        "ALTER TABLE airbnb_rooms ADD COLUMN IF NOT EXISTS source_file TEXT",
+        "ALTER TABLE airbnb_rooms ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+    ]),
+    # SHA-256 of the canonical JSON of the room and of its image and price breakdown rows,
+    # rows are only rewritten when their hash changes. NULL for rooms loaded before.
+    (3, "Add content hashes to airbnb_rooms", [
+        "ALTER TABLE airbnb_rooms ADD COLUMN IF NOT EXISTS content_hash BYTEA",
+        "ALTER TABLE airbnb_rooms ADD COLUMN IF NOT EXISTS images_hash BYTEA",
+        "ALTER TABLE airbnb_rooms ADD COLUMN IF NOT EXISTS price_breakdown_hash BYTEA",
+    ]),
+    # Append only history of what each crawl saw. It is partitioned by month of the crawl,
+    # so trend queries only scan the months they ask for and old months are dropped as
+    # whole tables. Partitions are created by ensure_partitions.
+    (4, "Create the room_observations history table", [
         """
+        CREATE TABLE IF NOT EXISTS room_observations (
+            room_id BIGINT NOT NULL,
+            crawled_at TIMESTAMP NOT NULL,
+            check_in DATE,
+            check_out DATE,
+            price_amount DECIMAL(10,2),
+            price_currency_symbol VARCHAR(10),
+            rating_value DECIMAL(3,2),
+            rating_review_count INTEGER,
+            PRIMARY KEY (room_id, crawled_at)
+        ) PARTITION BY RANGE (crawled_at);
+        """,
+    ]),
+    # grid_cell buckets rooms in cells of 0.01 degree (about 1.1 km of latitude):
+    # floor((latitude + 90) * 100) * 100000 + floor((longitude + 180) * 100).
+    # The rollups are refreshed by refresh_rollups for the cells each file observed.
+    (5, "Add grid cells, analytics indexes and daily rollups per cell", [
+        """
+        ALTER TABLE airbnb_rooms ADD COLUMN IF NOT EXISTS grid_cell BIGINT GENERATED ALWAYS AS (
+            floor((latitude + 90) * 100)::BIGINT * 100000 + floor((longitude + 180) * 100)::BIGINT
+        ) STORED
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_airbnb_rooms_grid_cell ON airbnb_rooms (grid_cell)",
+        "CREATE INDEX IF NOT EXISTS idx_airbnb_rooms_price_amount ON airbnb_rooms (price_amount)",
+        "CREATE INDEX IF NOT EXISTS idx_airbnb_rooms_category ON airbnb_rooms (category)",
+        "CREATE INDEX IF NOT EXISTS idx_airbnb_rooms_rating_value ON airbnb_rooms (rating_value)",
+        # the loaders replace images and price breakdowns by room_id
+        "CREATE INDEX IF NOT EXISTS idx_room_images_room_id ON room_images (room_id)",
+        "CREATE INDEX IF NOT EXISTS idx_price_breakdown_room_id ON price_breakdown (room_id)",
+        "CREATE INDEX IF NOT EXISTS idx_room_observations_crawled_at ON room_observations (crawled_at)",
+        """
+        CREATE TABLE IF NOT EXISTS room_cell_daily (
+            day DATE NOT NULL,
+            grid_cell BIGINT NOT NULL,
+            category VARCHAR(100) NOT NULL,
+            center_latitude DECIMAL(9,6),
+            center_longitude DECIMAL(9,6),
+            listings INTEGER,
+            avg_price DECIMAL(10,2),
+            min_price DECIMAL(10,2),
+            max_price DECIMAL(10,2),
+            avg_rating DECIMAL(3,2),
+            rated_listings INTEGER,
+            reviews INTEGER,
+            PRIMARY KEY (day, grid_cell, category)
+        );
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS room_badge_daily (
+            day DATE NOT NULL,
+            grid_cell BIGINT NOT NULL,
+            badge TEXT NOT NULL,
+            listings INTEGER,
+            PRIMARY KEY (day, grid_cell, badge)
+        );
+        """,
+    ]),
+    # The raw listing JSON leaves airbnb_rooms, which keeps only typed columns. A payload is
+    # stored when the content of a room changes, keyed by room and crawl time, in monthly
+    # partitions compressed with lz4 when the server supports it (pglz otherwise).
+    # Run VACUUM FULL airbnb_rooms afterwards to give back the space of the dropped column.
+    (6, "Move raw_data from airbnb_rooms to room_payloads", [
+        """
+        CREATE TABLE IF NOT EXISTS room_payloads (
+            room_id BIGINT NOT NULL,
+            crawled_at TIMESTAMP NOT NULL,
+            content_hash BYTEA,
+            raw_data JSONB NOT NULL,
+            PRIMARY KEY (room_id, crawled_at)
+        ) PARTITION BY RANGE (crawled_at);
+        """,
+        """
+        DO $$
+        BEGIN
+            ALTER TABLE room_payloads ALTER COLUMN raw_data SET COMPRESSION lz4;
+        EXCEPTION WHEN feature_not_supported THEN
+            NULL;
+        END $$;
+        """,
+        """
+        DO $$
+        DECLARE
+            month DATE;
+        BEGIN
+            FOR month IN
+                SELECT DISTINCT date_trunc('month', COALESCE(updated_at, created_at, now()))::date
+                FROM airbnb_rooms WHERE raw_data IS NOT NULL
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF room_payloads FOR VALUES FROM (%L) TO (%L)',
+                    'room_payloads_y' || to_char(month, 'YYYY') || 'm' || to_char(month, 'MM'),
+                    month, (month + interval '1 month')::date
+                );
+            END LOOP;
+        END $$;
+        """,
+        """
+        INSERT INTO room_payloads (room_id, crawled_at, content_hash, raw_data)
+        SELECT room_id, COALESCE(updated_at, created_at, now()), content_hash, raw_data
+        FROM airbnb_rooms WHERE raw_data IS NOT NULL
+        """,
+        "ALTER TABLE airbnb_rooms DROP COLUMN IF EXISTS raw_data",
+    ]),
+]
+
+# Advisory lock held while migrating, so loaders starting together don't migrate twice
+MIGRATION_LOCK_ID = 7243101
+
+# Advisory lock held while refreshing the rollups, until the file is committed
+ROLLUP_LOCK_ID = 7243102
+
+# Columns of each table, read from the catalog once and reset by migrate
+schema_cache = {}
+
+# Tables partitioned by month of the crawl
+PARTITIONED_TABLES = ["room_observations", "room_payloads"]
+
+# (table, month) of the partitions known to exist, reset by migrate
+known_partitions = set()
+
+def migrate(conn):
+    """
+    Apply the pending MIGRATIONS in one transaction, creating the tables on a new database
+    and upgrading the ones created by older versions. Run it once at startup.
+    Returns the schema version.
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+        current_version = cursor.fetchone()[0]
         
-        cursor.execute(create_rooms_table)
-        cursor.execute(create_images_table)
-        cursor.execute(create_price_breakdown_table)
-        cursor.execute(create_file_log_table)
-        
-        # Add missing columns to existing tables if they don't exist
-        add_missing_columns(conn)
+        for version, description, statements in MIGRATIONS:
+            if version <= current_version:
+                continue
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute("INSERT INTO schema_version (version, description) VALUES (%s, %s)", (version, description))
+            current_version = version
+            print(f"✓ Applied migration {version}: {description}")
         
         conn.commit()
-        print("✓ All tables created/verified successfully")
+        schema_cache.clear()
+        known_partitions.clear()
+        print(f"✓ Database schema at version {current_version}")
+        return current_version
         
     except Exception as e:
-        print(f"✗ Error creating tables: {e}")
+        print(f"✗ Error migrating the database: {e}")
         conn.rollback()
         raise
     finally:
         cursor.close()
 
-def add_missing_columns(conn):
-    """Add missing columns to existing tables"""
-    cursor = conn.cursor()
-    
-    # List of columns to add if they don't exist
-    columns_to_add = [
-        {
-            'table': 'airbnb_rooms',
-            'column': 'source_file',
-            'definition': 'TEXT'
-        },
-        {
-            'table': 'airbnb_rooms', 
-            'column': 'updated_at',
-            'definition': 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP'
-        }
-    ]
-    
-    for col_info in columns_to_add:
+def create_tables(conn):
+    """Create tables for Airbnb data - only if they don't exist, see migrate"""
+    migrate(conn)
+
+def get_table_columns(conn, table):
+    """Columns of a table, the catalog is only queried the first time"""
+    if table not in schema_cache:
+        cursor = conn.cursor()
         try:
-            # Check if column exists
             cursor.execute("""
                 SELECT column_name 
                 FROM information_schema.columns 
-                WHERE table_name = %s AND column_name = %s
-            """, (col_info['table'], col_info['column']))
+                WHERE table_schema = current_schema() AND table_name = %s
+            """, (table,))
+            schema_cache[table] = frozenset(row[0] for row in cursor.fetchall())
+        finally:
+            cursor.close()
+    return schema_cache[table]
+
+def partition_name(table, month):
+    """Name of the partition of a month of a table partitioned by crawl time"""
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+def ensure_partitions(conn, crawled_at):
+    """
+    Create the partitions of PARTITIONED_TABLES for the month of a crawl if they don't exist.
+    It runs and commits its own short transaction, call it before loading a file. Inside a
+    transaction already open on conn, the partitions are created in it and left to the caller
+    to commit.
+    """
+    month = crawled_at.date().replace(day=1)
+    missing = [table for table in PARTITIONED_TABLES if (table, month) not in known_partitions]
+    if not missing:
+        return
+    next_month = (month + timedelta(days=32)).replace(day=1)
+    own_transaction = conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+    cursor = conn.cursor()
+    try:
+        # creating a partition locks its parent, skip the ones that already exist
+        cursor.execute("SELECT " + ", ".join(["to_regclass(%s)"] * len(missing)), [partition_name(table, month) for table in missing])
+        to_create = [table for table, exists in zip(missing, cursor.fetchone()) if exists is None]
+        if to_create:
+            # loaders running in parallel may need the same new month
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+        for table in to_create:
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {partition_name(table, month)}
+                PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)
+            """, (month, next_month))
+        if not own_transaction:
+            # the caller may still roll the partitions back, they are checked again next time
+            return
+        conn.commit()
+    except Exception:
+        if own_transaction:
+            conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    known_partitions.update((table, month) for table in missing)
+
+def refresh_rollups(conn, crawled_at=None):
+    """
+    Recompute room_cell_daily and room_badge_daily for the day of a crawl and the grid cells
+    of the rooms it observed, from the last observation of each room that day. Without a
+    crawl time every day and cell is rebuilt. Rows whose values did not change are not written.
+    Runs in the current transaction, the caller commits.
+    """
+    cursor = conn.cursor()
+    try:
+        # refreshes of files loaded in parallel are serialized, each one sees the observations
+        # committed by the others
+        cursor.execute("SELECT pg_advisory_xact_lock(%s)", (ROLLUP_LOCK_ID,))
+        cursor.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS touched_cells (
+                day DATE,
+                grid_cell BIGINT,
+                PRIMARY KEY (day, grid_cell)
+            ) ON COMMIT DELETE ROWS;
+            CREATE TEMP TABLE IF NOT EXISTS cell_observations (
+                day DATE,
+                grid_cell BIGINT,
+                category VARCHAR(100),
+                badges TEXT[],
+                price_amount DECIMAL(10,2),
+                rating_value DECIMAL(3,2),
+                rating_review_count INTEGER
+            ) ON COMMIT DELETE ROWS;
+            TRUNCATE touched_cells, cell_observations;
+        """)
+        cursor.execute("""
+            INSERT INTO touched_cells
+            SELECT DISTINCT o.crawled_at::date, r.grid_cell
+            FROM room_observations o JOIN airbnb_rooms r USING (room_id)
+            WHERE r.grid_cell IS NOT NULL AND (%(crawled_at)s::timestamp IS NULL OR o.crawled_at = %(crawled_at)s)
+        """, {"crawled_at": crawled_at})
+        cursor.execute("""
+            INSERT INTO cell_observations
+            SELECT DISTINCT ON (o.room_id, o.crawled_at::date)
+                o.crawled_at::date, r.grid_cell, COALESCE(r.category, ''), r.badges,
+                o.price_amount, o.rating_value, o.rating_review_count
+            FROM room_observations o
+            JOIN airbnb_rooms r USING (room_id)
+            JOIN touched_cells t ON t.day = o.crawled_at::date AND t.grid_cell = r.grid_cell
+            WHERE o.crawled_at >= (SELECT min(day) FROM touched_cells)
+                AND o.crawled_at < (SELECT max(day) FROM touched_cells) + 1
+            ORDER BY o.room_id, o.crawled_at::date, o.crawled_at DESC
+        """)
+        
+        cursor.execute("""
+            INSERT INTO room_cell_daily (
+                day, grid_cell, category, center_latitude, center_longitude, listings,
+                avg_price, min_price, max_price, avg_rating, rated_listings, reviews
+            )
+            SELECT day, grid_cell, category,
+                (grid_cell / 100000) / 100.0 - 90 + 0.005,
+                (grid_cell % 100000) / 100.0 - 180 + 0.005,
+                count(*), avg(price_amount), min(price_amount), max(price_amount),
+                avg(rating_value), count(rating_value), COALESCE(sum(rating_review_count), 0)
+            FROM cell_observations
+            GROUP BY day, grid_cell, category
+            ON CONFLICT (day, grid_cell, category) DO UPDATE SET
+                listings = EXCLUDED.listings,
+                avg_price = EXCLUDED.avg_price,
+                min_price = EXCLUDED.min_price,
+                max_price = EXCLUDED.max_price,
+                avg_rating = EXCLUDED.avg_rating,
+                rated_listings = EXCLUDED.rated_listings,
+                reviews = EXCLUDED.reviews
+            WHERE (room_cell_daily.listings, room_cell_daily.avg_price, room_cell_daily.min_price,
+                   room_cell_daily.max_price, room_cell_daily.avg_rating, room_cell_daily.rated_listings,
+                   room_cell_daily.reviews)
+                IS DISTINCT FROM (EXCLUDED.listings, EXCLUDED.avg_price, EXCLUDED.min_price,
+                   EXCLUDED.max_price, EXCLUDED.avg_rating, EXCLUDED.rated_listings, EXCLUDED.reviews);
             
-            if not cursor.fetchone():
-                # Column doesn't exist, add it
-                alter_query = f"ALTER TABLE {col_info['table']} ADD COLUMN {col_info['column']} {col_info['definition']}"
-                cursor.execute(alter_query)
-                print(f"✓ Added column {col_info['column']} to {col_info['table']}")
-            else:
-                print(f"✓ Column {col_info['column']} already exists in {col_info['table']}")
-                
-        except Exception as e:
-            print(f"Warning: Could not add column {col_info['column']} to {col_info['table']}: {e}")
-    
-    cursor.close()
+            DELETE FROM room_cell_daily d USING touched_cells t
+            WHERE d.day = t.day AND d.grid_cell = t.grid_cell AND NOT EXISTS (
+                SELECT 1 FROM cell_observations c
+                WHERE c.day = d.day AND c.grid_cell = d.grid_cell AND c.category = d.category
+            );
+            
+            INSERT INTO room_badge_daily (day, grid_cell, badge, listings)
+            SELECT day, grid_cell, badge, count(*)
+            FROM cell_observations, unnest(badges) AS badge
+            GROUP BY day, grid_cell, badge
+            ON CONFLICT (day, grid_cell, badge) DO UPDATE SET listings = EXCLUDED.listings
+            WHERE room_badge_daily.listings IS DISTINCT FROM EXCLUDED.listings;
+            
+            DELETE FROM room_badge_daily d USING touched_cells t
+            WHERE d.day = t.day AND d.grid_cell = t.grid_cell AND NOT EXISTS (
+                SELECT 1 FROM cell_observations c
+                WHERE c.day = d.day AND c.grid_cell = d.grid_cell AND d.badge = ANY(c.badges)
+            );
+        """)
+        cursor.execute("SELECT count(*) FROM touched_cells")
+        print(f"✓ Refreshed the rollups of {cursor.fetchone()[0]} cells")
+    finally:
+        cursor.close()
+
+def drop_observations_before(conn, month):
+    """Drop the room_observations partitions of the months before the given date, returns their names"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT c.relname
+            FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = 'room_observations'::regclass
+            ORDER BY c.relname
+        """)
+        # partition names sort like their months
+        limit = partition_name("room_observations", month)
+        dropped = [name for (name,) in cursor.fetchall() if name < limit]
+        for name in dropped:
+            cursor.execute(f"DROP TABLE {name}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    known_partitions.clear()
+    for name in dropped:
+        print(f"✓ Dropped {name}")
+    return dropped
 
 def log_file_processing(conn, file_path, records_count, status, error_message=None):
     """Log file processing status"""
@@ -349,8 +782,56 @@ def log_file_processing(conn, file_path, records_count, status, error_message=No
     finally:
         cursor.close()
 
-def insert_room_data(conn, rooms_data):
-    """Insert room data into the database"""
+def extract_room_fields(room):
+    """Extract the airbnb_rooms column values of a room, in ROOM_COLUMNS order after room_id"""
+    category = room.get('category')
+    kind = room.get('kind')
+    name = room.get('name')
+    title = room.get('title')
+    room_type = room.get('type')
+
+    # Extract rating data
+    rating = room.get('rating', {})
+    rating_value = rating.get('value')
+    rating_review_count = None
+    if rating.get('reviewCount'):
+        try:
+            rating_review_count = int(rating.get('reviewCount'))
+        except:
+            rating_review_count = None
+
+    # Extract price data
+    price = room.get('price', {})
+    unit_price = price.get('unit', {})
+    price_amount = unit_price.get('amount')
+    price_qualifier = unit_price.get('qualifier')
+    price_currency = unit_price.get('currency_symbol', unit_price.get('curency_symbol', ''))
+
+    # Extract coordinates
+    coordinates = room.get('coordinates', {})
+    latitude = coordinates.get('latitude')
+    longitude = coordinates.get('longitude', coordinates.get('longitud'))
+
+    # Extract badges
+    badges = room.get('badges', [])
+    
+    return (
+        category, kind, name, title, room_type,
+        rating_value, rating_review_count, price_amount,
+        price_qualifier, price_currency, latitude, longitude,
+        badges
+    )
+
+def insert_room_data(conn, rooms_data, crawled_at=None):
+    """
+    Insert room data into the database, returns the number of rooms inserted, updated and unchanged.
+    Rooms whose content hash did not change are skipped, images and price breakdown are only
+    replaced when the hash of the set changed.
+    Every room is also recorded in room_observations and the raw JSON of changed rooms is
+    stored in room_payloads, at crawled_at or now.
+    """
+    crawled_at = crawled_at or datetime.now()
+    ensure_partitions(conn, crawled_at)
     cursor = conn.cursor()
     
     # Check if rooms_data is actually a list
@@ -360,8 +841,40 @@ def insert_room_data(conn, rooms_data):
     
     print(f"Processing {len(rooms_data)} rooms...")
     successful_inserts = 0
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    observations = []
+    payloads = {}
+    
+    # Schema facts are cached, the loop runs no catalog query
+    table_columns = get_table_columns(conn, 'airbnb_rooms')
+    columns = [column for column in ROOM_COLUMNS if column in table_columns]
+    if 'updated_at' in table_columns:
+        columns.append('updated_at')
+    hashed = 'content_hash' in table_columns
+    insert_room_query = f"""
+    INSERT INTO airbnb_rooms ({', '.join(columns)})
+    VALUES ({', '.join(['%s'] * len(columns))})
+    ON CONFLICT (room_id) DO UPDATE SET
+        {', '.join(f'{column} = EXCLUDED.{column}' for column in columns[1:])}
+    RETURNING (xmax = 0) AS inserted
+    """
+    
+    # Hashes stored for the rooms of the batch, in one query. The rows stay locked until the
+    # batch is committed so another loader can't change them after they are read.
+    stored_hashes = {}
+    if hashed:
+        room_ids = [int(room['room_id']) for room in rooms_data if room.get('room_id')]
+        cursor.execute("""
+            SELECT room_id, content_hash, images_hash, price_breakdown_hash
+            FROM airbnb_rooms WHERE room_id = ANY(%s)
+            ORDER BY room_id
+            FOR UPDATE
+        """, (room_ids,))
+        for row in cursor.fetchall():
+            stored_hashes[row[0]] = tuple(bytes(value) if value is not None else None for value in row[1:])
     
     for idx, room in enumerate(rooms_data):
+        savepoint = False
         try:
             if idx % 50 == 0:  # Progress indicator
                 print(f"Processing room {idx + 1}/{len(rooms_data)}")
@@ -372,150 +885,344 @@ def insert_room_data(conn, rooms_data):
                 print(f"Skipping room {idx}: No room_id found")
                 continue
             
-            category = room.get('category')
-            kind = room.get('kind')
-            name = room.get('name')
-            title = room.get('title')
-            room_type = room.get('type')
-            
-            # Extract rating data
-            rating = room.get('rating', {})
-            rating_value = rating.get('value')
-            rating_review_count = None
-            if rating.get('reviewCount'):
-                try:
-                    rating_review_count = int(rating.get('reviewCount'))
-                except:
-                    rating_review_count = None
-            
-            # Extract price data
-            price = room.get('price', {})
-            unit_price = price.get('unit', {})
-            price_amount = unit_price.get('amount')
-            price_qualifier = unit_price.get('qualifier')
-            price_currency = unit_price.get('currency_symbol', unit_price.get('curency_symbol', ''))
-            
-            # Extract coordinates
-            coordinates = room.get('coordinates', {})
-            latitude = coordinates.get('latitude')
-            longitude = coordinates.get('longitude', coordinates.get('longitud'))
+            fields = extract_room_fields(room)
+            values = dict(zip(ROOM_COLUMNS, (room_id,) + fields))
+            observation = (
+                room_id, crawled_at, room.get('check_in'), room.get('check_out'), values['price_amount'],
+                values['price_currency_symbol'], values['rating_value'], values['rating_review_count']
+            )
             
-            # Extract badges
-            badges = room.get('badges', [])
-            
-            # Check if updated_at column exists
-            cursor.execute("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name = 'airbnb_rooms' AND column_name = 'updated_at'
-            """)
-            has_updated_at = cursor.fetchone() is not None
+            images, breakdowns = extract_child_rows(room)
+            hashes = (content_hash(room), content_hash(images), content_hash(breakdowns))
+            previous = stored_hashes.get(int(room_id), (None, None, None))
+            if hashed and previous[0] == hashes[0]:
+                observations.append(observation)
+                successful_inserts += 1
+                counts["unchanged"] += 1
+                continue
             
-            # Insert main room record - with or without updated_at column
-            if has_updated_at:
-                insert_room_query = """
-                INSERT INTO airbnb_rooms (
-                    room_id, category, kind, name, title, type,
-                    rating_value, rating_review_count, price_amount, 
-                    price_qualifier, price_currency_symbol, latitude, longitude,
-                    badges, raw_data, updated_at
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (room_id) DO UPDATE SET
-                    category = EXCLUDED.category,
-                    kind = EXCLUDED.kind,
-                    name = EXCLUDED.name,
-                    title = EXCLUDED.title,
-                    type = EXCLUDED.type,
-                    rating_value = EXCLUDED.rating_value,
-                    rating_review_count = EXCLUDED.rating_review_count,
-                    price_amount = EXCLUDED.price_amount,
-                    price_qualifier = EXCLUDED.price_qualifier,
-                    price_currency_symbol = EXCLUDED.price_currency_symbol,
-                    latitude = EXCLUDED.latitude,
-                    longitude = EXCLUDED.longitude,
-                    badges = EXCLUDED.badges,
-                    raw_data = EXCLUDED.raw_data,
-                    updated_at = EXCLUDED.updated_at
-                """
-                
-                cursor.execute(insert_room_query, (
-                    room_id, category, kind, name, title, room_type,
-                    rating_value, rating_review_count, price_amount,
-                    price_qualifier, price_currency, latitude, longitude,
-                    badges, json.dumps(room), datetime.now()
-                ))
-            else:
-                # Fallback for existing schema without updated_at column
-                insert_room_query = """
-                INSERT INTO airbnb_rooms (
-                    room_id, category, kind, name, title, type,
-                    rating_value, rating_review_count, price_amount, 
-                    price_qualifier, price_currency_symbol, latitude, longitude,
-                    badges, raw_data
-                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (room_id) DO UPDATE SET
-                    category = EXCLUDED.category,
-                    kind = EXCLUDED.kind,
-                    name = EXCLUDED.name,
-                    title = EXCLUDED.title,
-                    type = EXCLUDED.type,
-                    rating_value = EXCLUDED.rating_value,
-                    rating_review_count = EXCLUDED.rating_review_count,
-                    price_amount = EXCLUDED.price_amount,
-                    price_qualifier = EXCLUDED.price_qualifier,
-                    price_currency_symbol = EXCLUDED.price_currency_symbol,
-                    latitude = EXCLUDED.latitude,
-                    longitude = EXCLUDED.longitude,
-                    badges = EXCLUDED.badges,
-                    raw_data = EXCLUDED.raw_data
-                """
-                
-                cursor.execute(insert_room_query, (
-                    room_id, category, kind, name, title, room_type,
-                    rating_value, rating_review_count, price_amount,
-                    price_qualifier, price_currency, latitude, longitude,
-                    badges, json.dumps(room)
-                ))
+            # Each room is written under a savepoint, a failing room only rolls back its own rows
+            cursor.execute("SAVEPOINT room")
+            savepoint = True
             
-            # Delete existing images and price breakdowns for this room before inserting new ones
-            cursor.execute("DELETE FROM room_images WHERE room_id = %s", (room_id,))
-            cursor.execute("DELETE FROM price_breakdown WHERE room_id = %s", (room_id,))
+            # Insert main room record
+            values = dict(zip(ROOM_COLUMNS, (room_id,) + fields + hashes))
+            values['updated_at'] = datetime.now()
+            cursor.execute(insert_room_query, [values[column] for column in columns])
+            inserted = cursor.fetchone()[0]
             
-            # Insert images
-            images = room.get('images', [])
-            for idx_img, image in enumerate(images):
-                if isinstance(image, dict) and image.get('url'):
+            # Replace the images and price breakdowns of this room when they changed
+            if not hashed or previous[1] != hashes[1]:
+                cursor.execute("DELETE FROM room_images WHERE room_id = %s", (room_id,))
+                for image_url, image_order in images:
                     insert_image_query = """
                     INSERT INTO room_images (room_id, image_url, image_order)
                     VALUES (%s, %s, %s)
                     """
-                    cursor.execute(insert_image_query, (room_id, image.get('url'), idx_img + 1))
+                    cursor.execute(insert_image_query, (room_id, image_url, image_order))
             
-            # Insert price breakdown
-            price_breakdown = price.get('break_down', [])
-            for breakdown in price_breakdown:
-                if isinstance(breakdown, dict):
+            if not hashed or previous[2] != hashes[2]:
+                cursor.execute("DELETE FROM price_breakdown WHERE room_id = %s", (room_id,))
+                for description, amount, currency in breakdowns:
                     insert_breakdown_query = """
                     INSERT INTO price_breakdown (room_id, description, amount, currency)
                     VALUES (%s, %s, %s, %s)
                     """
-                    cursor.execute(insert_breakdown_query, (
-                        room_id,
-                        breakdown.get('description'),
-                        breakdown.get('amount'),
-                        breakdown.get('currency')
-                    ))
+                    cursor.execute(insert_breakdown_query, (room_id, description, amount, currency))
             
-            successful_inserts += 1
+            cursor.execute("RELEASE SAVEPOINT room")
             
         except Exception as e:
             print(f"✗ Error inserting room {room.get('room_id', f'index-{idx}')}: {e}")
-            conn.rollback()
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT room")
             continue
+        
+        stored_hashes[int(room_id)] = hashes
+        payloads[int(room_id)] = (room_id, crawled_at, hashes[0], fastjson.dumps(room))
+        observations.append(observation)
+        successful_inserts += 1
+        counts["inserted" if inserted else "updated"] += 1
+    
+    if payloads:
+        execute_values(cursor, """
+            INSERT INTO room_payloads (room_id, crawled_at, content_hash, raw_data) VALUES %s
+            ON CONFLICT (room_id, crawled_at) DO UPDATE SET
+                content_hash = EXCLUDED.content_hash,
+                raw_data = EXCLUDED.raw_data
+        """, list(payloads.values()))
+    
+    if observations:
+        execute_values(cursor, """
+            INSERT INTO room_observations (
+                room_id, crawled_at, check_in, check_out, price_amount,
+                price_currency_symbol, rating_value, rating_review_count
+            ) VALUES %s
+            ON CONFLICT (room_id, crawled_at) DO NOTHING
+        """, observations)
     
     conn.commit()
     cursor.close()
     print(f"Successfully inserted {successful_inserts} out of {len(rooms_data)} rooms")
+    return counts
+
+# Columns of airbnb_rooms written by the loaders
+ROOM_COLUMNS = [
+    "room_id", "category", "kind", "name", "title", "type",
+    "rating_value", "rating_review_count", "price_amount",
+    "price_qualifier", "price_currency_symbol", "latitude", "longitude",
+    "badges", "content_hash", "images_hash", "price_breakdown_hash"
+]
+
+def content_hash(value):
+    """SHA-256 of the canonical JSON encoding of a value (sorted keys, compact)"""
+    return hashlib.sha256(fastjson.dumps_bytes(value, sort_keys=True)).digest()
+
+def extract_child_rows(room):
+    """Image rows (url, order) and price breakdown rows (description, amount, currency) of a room"""
+    images = []
+    for idx_img, image in enumerate(room.get('images', [])):
+        if isinstance(image, dict) and image.get('url'):
+            images.append((image.get('url'), idx_img + 1))
+    breakdowns = []
+    for breakdown in room.get('price', {}).get('break_down', []):
+        if isinstance(breakdown, dict):
+            breakdowns.append((breakdown.get('description'), breakdown.get('amount'), breakdown.get('currency')))
+    return images, breakdowns
+
+def create_staging_tables(cursor):
+    """Create the session staging tables used by the bulk loader (temporary tables are never WAL logged)"""
+    cursor.execute("""
+        CREATE TEMP TABLE IF NOT EXISTS staging_rooms (
+            seq INTEGER,
+            room_id BIGINT,
+            category VARCHAR(100),
+            kind VARCHAR(50),
+            name TEXT,
+            title TEXT,
+            type VARCHAR(50),
+            rating_value DECIMAL(3,2),
+            rating_review_count INTEGER,
+            price_amount DECIMAL(10,2),
+            price_qualifier VARCHAR(100),
+            price_currency_symbol VARCHAR(10),
+            latitude DECIMAL(11,8),
+            longitude DECIMAL(11,8),
+            badges TEXT[],
+            content_hash BYTEA,
+            images_hash BYTEA,
+            price_breakdown_hash BYTEA,
+            raw_data JSONB,
+            check_in DATE,
+            check_out DATE
+        ) ON COMMIT DELETE ROWS;
+        CREATE TEMP TABLE IF NOT EXISTS staging_images (
+            seq INTEGER,
+            room_id BIGINT,
+            image_url TEXT,
+            image_order INTEGER
+        ) ON COMMIT DELETE ROWS;
+        CREATE TEMP TABLE IF NOT EXISTS staging_price_breakdown (
+            seq INTEGER,
+            room_id BIGINT,
+            description TEXT,
+            amount DECIMAL(10,2),
+            currency VARCHAR(10)
+        ) ON COMMIT DELETE ROWS;
+        CREATE TEMP TABLE IF NOT EXISTS changed_rooms (
+            room_id BIGINT PRIMARY KEY,
+            seq INTEGER,
+            images_changed BOOLEAN,
+            price_breakdown_changed BOOLEAN
+        ) ON COMMIT DELETE ROWS;
+        CREATE TEMP TABLE IF NOT EXISTS upserted_rooms (
+            room_id BIGINT PRIMARY KEY,
+            inserted BOOLEAN
+        ) ON COMMIT DELETE ROWS;
+    """)
+
+def pg_array(values):
+    """Format a list of strings as a PostgreSQL array literal"""
+    items = []
+    for value in values:
+        if value is None:
+            items.append("NULL")
+        else:
+            items.append('"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"')
+    return "{" + ",".join(items) + "}"
+
+def copy_value(value):
+    """Format a value for COPY text format"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, list):
+        value = pg_array(value)
+    elif isinstance(value, bytes):
+        value = "\\x" + value.hex()
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+def copy_rows(cursor, table, columns, rows):
+    """Stream rows into a table with COPY"""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(copy_value(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+def bulk_insert_room_data(conn, rooms_data, commit=True, crawled_at=None):
+    """
+    Bulk load rooms: COPY into staging tables, then merge into airbnb_rooms, room_images and
+    price_breakdown with set based statements, in one transaction.
+    With commit=False the transaction is left open so several batches can be committed together.
+    Rooms whose content hash did not change are not written at all, and images and price
+    breakdown are only replaced when the hash of the set changed.
+    Every room is also recorded in room_observations and the raw JSON of changed rooms is
+    stored in room_payloads, at crawled_at or now.
+    Returns a dict with the number of rooms inserted, updated and unchanged.
+    """
+    crawled_at = crawled_at or datetime.now()
+    ensure_partitions(conn, crawled_at)
+    cursor = conn.cursor()
+    room_rows = []
+    image_rows = []
+    breakdown_rows = []
+    for seq, room in enumerate(rooms_data):
+        room_id = room.get('room_id')
+        if not room_id:
+            print(f"Skipping room {seq}: No room_id found")
+            continue
+        images, breakdowns = extract_child_rows(room)
+        room_rows.append((seq, room_id) + extract_room_fields(room) + (
+            content_hash(room), content_hash(images), content_hash(breakdowns),
+            fastjson.dumps(room), room.get('check_in'), room.get('check_out')
+        ))
+        image_rows.extend((seq, room_id) + image for image in images)
+        breakdown_rows.extend((seq, room_id) + breakdown for breakdown in breakdowns)
+    
+    updated_columns = ROOM_COLUMNS[1:]
+    try:
+        create_staging_tables(cursor)
+        cursor.execute("TRUNCATE staging_rooms, staging_images, staging_price_breakdown, changed_rooms, upserted_rooms")
+        copy_rows(cursor, "staging_rooms", ["seq"] + ROOM_COLUMNS + ["raw_data", "check_in", "check_out"], room_rows)
+        copy_rows(cursor, "staging_images", ["seq", "room_id", "image_url", "image_order"], image_rows)
+        copy_rows(cursor, "staging_price_breakdown", ["seq", "room_id", "description", "amount", "currency"], breakdown_rows)
+        
+        # The last occurrence of a room in the file wins, like with the row by row loader.
+        # Rooms with the stored content hash are left out, their rows are not even locked.
+        # The stored rows that change are locked in room_id order before their hashes are
+        # compared, so a file loaded in parallel can't commit other hashes before the upsert;
+        # rooms not stored yet get all their children written.
+        cursor.execute("""
+            INSERT INTO changed_rooms (room_id, seq, images_changed, price_breakdown_changed)
+            WITH s AS (
+                SELECT DISTINCT ON (room_id) room_id, seq, content_hash, images_hash, price_breakdown_hash
+                FROM staging_rooms
+                ORDER BY room_id, seq DESC
+            ), locked AS (
+                SELECT r.room_id, r.content_hash, r.images_hash, r.price_breakdown_hash
+                FROM airbnb_rooms r
+                JOIN s USING (room_id)
+                WHERE r.content_hash IS DISTINCT FROM s.content_hash
+                ORDER BY r.room_id
+                FOR UPDATE OF r
+            )
+            SELECT s.room_id, s.seq,
+                l.images_hash IS DISTINCT FROM s.images_hash,
+                l.price_breakdown_hash IS DISTINCT FROM s.price_breakdown_hash
+            FROM s
+            JOIN locked l USING (room_id)
+            WHERE l.content_hash IS DISTINCT FROM s.content_hash
+            UNION ALL
+            SELECT s.room_id, s.seq, true, true
+            FROM s
+            WHERE NOT EXISTS (SELECT 1 FROM airbnb_rooms r WHERE r.room_id = s.room_id)
+        """)
+        
+        cursor.execute(f"""
+            WITH upserted AS (
+                INSERT INTO airbnb_rooms ({', '.join(ROOM_COLUMNS)}, updated_at)
+                SELECT {', '.join(f's.{column}' for column in ROOM_COLUMNS)}, now()
+                FROM staging_rooms s
+                JOIN changed_rooms USING (room_id, seq)
+                ORDER BY s.room_id
+                ON CONFLICT (room_id) DO UPDATE SET
+                    {', '.join(f'{column} = EXCLUDED.{column}' for column in updated_columns)},
+                    updated_at = EXCLUDED.updated_at
+                WHERE airbnb_rooms.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+                RETURNING room_id, (xmax = 0) AS inserted
+            )
+            INSERT INTO upserted_rooms SELECT room_id, inserted FROM upserted
+        """)
+        
+        # Replace the images and price breakdown whose hash changed only
+        cursor.execute("""
+            DELETE FROM room_images WHERE room_id IN (
+                SELECT room_id FROM changed_rooms JOIN upserted_rooms USING (room_id) WHERE images_changed
+            );
+            DELETE FROM price_breakdown WHERE room_id IN (
+                SELECT room_id FROM changed_rooms JOIN upserted_rooms USING (room_id) WHERE price_breakdown_changed
+            );
+            INSERT INTO room_images (room_id, image_url, image_order)
+            SELECT i.room_id, i.image_url, i.image_order
+            FROM staging_images i
+            JOIN changed_rooms USING (room_id, seq)
+            JOIN upserted_rooms USING (room_id)
+            WHERE images_changed
+            ORDER BY i.room_id, i.image_order;
+            INSERT INTO price_breakdown (room_id, description, amount, currency)
+            SELECT b.room_id, b.description, b.amount, b.currency
+            FROM staging_price_breakdown b
+            JOIN changed_rooms USING (room_id, seq)
+            JOIN upserted_rooms USING (room_id)
+            WHERE price_breakdown_changed;
+        """)
+        
+        # The raw JSON of the rooms that changed, the payload of a room at a crawl is
+        # its last one up to that crawl
+        cursor.execute("""
+            INSERT INTO room_payloads (room_id, crawled_at, content_hash, raw_data)
+            SELECT s.room_id, %s, s.content_hash, s.raw_data
+            FROM staging_rooms s
+            JOIN changed_rooms USING (room_id, seq)
+            JOIN upserted_rooms USING (room_id)
+            ON CONFLICT (room_id, crawled_at) DO UPDATE SET
+                content_hash = EXCLUDED.content_hash,
+                raw_data = EXCLUDED.raw_data
+        """, (crawled_at,))
+        
+        # Every room of the crawl is observed, changed or not
+        cursor.execute("""
+            INSERT INTO room_observations (
+                room_id, crawled_at, check_in, check_out, price_amount,
+                price_currency_symbol, rating_value, rating_review_count
+            )
+            SELECT DISTINCT ON (room_id)
+                room_id, %s, check_in, check_out, price_amount,
+                price_currency_symbol, rating_value, rating_review_count
+            FROM staging_rooms
+            ORDER BY room_id, seq DESC
+            ON CONFLICT (room_id, crawled_at) DO NOTHING
+        """, (crawled_at,))
+    
+        cursor.execute("""
+            SELECT
+                (SELECT count(*) FROM upserted_rooms WHERE inserted),
+                (SELECT count(*) FROM upserted_rooms WHERE NOT inserted),
+                (SELECT count(DISTINCT room_id) FROM staging_rooms)
+        """)
+        inserted, updated, total = cursor.fetchone()
+        if commit:
+            conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    
+    counts = {"inserted": inserted, "updated": updated, "unchanged": total - inserted - updated}
+    print(f"Bulk loaded {len(room_rows)} rooms: {counts['inserted']} inserted, {counts['updated']} updated, {counts['unchanged']} unchanged")
+    return counts
 
 def verify_data(conn):
     """Verify that data was inserted"""
@@ -537,6 +1244,26 @@ def verify_data(conn):
         breakdown_count = cursor.fetchone()[0]
         print(f"Total price breakdowns in database: {breakdown_count}")
         
+        # Count raw payloads, kept out of airbnb_rooms
+        cursor.execute("SELECT COUNT(*), COUNT(DISTINCT room_id) FROM room_payloads")
+        payload_count, payload_rooms = cursor.fetchone()
+        print(f"Total raw payloads in database: {payload_count} for {payload_rooms} rooms")
+        
+        # Sizes of the hot rooms table and of the payloads, with their TOAST data and indexes
+        cursor.execute("""
+            SELECT
+                pg_total_relation_size('airbnb_rooms'),
+                (SELECT COALESCE(SUM(pg_total_relation_size(inhrelid)), 0) FROM pg_inherits
+                 WHERE inhparent = 'room_payloads'::regclass)
+        """)
+        rooms_size, payloads_size = cursor.fetchone()
+        print(f"Size of airbnb_rooms: {rooms_size / 1024:,.0f} kB, of room_payloads: {payloads_size / 1024:,.0f} kB")
+        
+        # Count observations and their monthly partitions
+        cursor.execute("SELECT COUNT(*), COUNT(DISTINCT tableoid) FROM room_observations")
+        observation_count, partition_count = cursor.fetchone()
+        print(f"Total room observations in database: {observation_count} in {partition_count} monthly partitions")
+        
         # Show file processing log
         cursor.execute("SELECT COUNT(*) FROM file_processing_log")
         log_count = cursor.fetchone()[0]
@@ -574,8 +1301,8 @@ def main():
         return
     
     try:
-        # Create tables if they don't exist
-        create_tables(conn)
+        # Create or upgrade the tables, once at startup
+        migrate(conn)
         
         # Process all JSON files in the folder
         process_json_files(conn, JSON_FOLDER)
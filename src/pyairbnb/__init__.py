@@ -1,9 +1,20 @@
-from pyairbnb.utils import parse_proxy,get_nested_value
+from pyairbnb.utils import parse_proxy,get_nested_value,NestedPath,PartialResultsError,StatusCodeError
 from pyairbnb.api import get as get_api_key
+from pyairbnb.api import ApiKeyCache,get_cached as get_cached_api_key
 from pyairbnb.host import get_listings_from_user
 from pyairbnb.experience import search_by_place_id as experience_search_by_place_id
 from pyairbnb.search import get_markets,get_places_ids
-from pyairbnb.start import get_calendar,search_all,search_all_from_url,search_first_page,get_reviews,get_details
+from pyairbnb.start import get_calendar,search_all,iter_search,search_all_tiled,search_all_from_url,search_first_page,get_reviews,get_details,get_details_many
 from pyairbnb.start import search_experience_by_taking_the_first_inputs_i_dont_care as experience_search
 from pyairbnb.details import get as get_metadata_from_url
-from pyairbnb.price import get as get_price
\ No newline at end of file
+from pyairbnb.price import get as get_price
+from pyairbnb.client import Client
+from pyairbnb.ratelimit import RateLimiter
+from pyairbnb.proxypool import ProxyPool
+from pyairbnb.retry import RetryPolicy,CircuitBreaker,CircuitOpenError
+from pyairbnb.cache import ResponseCache
+from pyairbnb.columns import SearchColumns
+from pyairbnb.jsonl import JsonlWriter,read as read_jsonl
+from pyairbnb.parquet import export_search as export_search_parquet,export_details as export_details_parquet,read as read_parquet
+from pyairbnb.standardize import from_search_columnar
+from pyairbnb.async_client import AsyncAirbnbClient
\ No newline at end of file
@@ -1,11 +1,28 @@
-from curl_cffi import requests
+from pyairbnb.client import Client, get_client
+import pyairbnb.utils as utils
+from contextlib import contextmanager
+import threading
+import pyairbnb.fastjson as fastjson
+import time
+import os
 import re
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 ep = "https://www.airbnb.com"
 
 regx_api_key = re.compile(r'"api_config":{"key":".+?"')
 
-def get(proxy_url: str) -> str:
+default_cache_path = os.path.join(os.path.expanduser("~"), ".cache", "pyairbnb", "api_key.json")
+
+def get(proxy_url: str, client: Client = None) -> str:
+    method, url, kwargs = prepare()
+    response = get_client(client, proxy_url).request(method, url, **kwargs)
+    return parse(response)
+
+def prepare():
     headers = {
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
         "Accept-Language": "en",
@@ -21,11 +38,9 @@ def get(proxy_url: str) -> str:
         "Upgrade-Insecure-Requests": "1",
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
     }
-    proxies = {}
-    if proxy_url:
-        proxies = {"http": proxy_url, "https": proxy_url}
+    return "GET", ep, {"headers": headers, "timeout": 60}
 
-    response = requests.get(ep, headers=headers, proxies=proxies, timeout=60)  
+def parse(response) -> str:
     response.raise_for_status() 
 
     body = response.text
@@ -33,3 +48,132 @@ def get(proxy_url: str) -> str:
     api_key = api_key.replace('"api_config":{"key":"', '')
     api_key = api_key.replace('"', "")
     return api_key
+
+class ApiKeyCache:
+    """
+    Keeps the airbnb API key in memory and on disk so the homepage is only downloaded
+    when the cached key is older than `ttl` or the API rejects it.
+
+    Fetches are single-flight: threads share a lock and processes share a lock file next
+    to the cache file, so concurrent workers wait for the key fetched by the first one.
+
+    Args:
+        path (str): JSON file used to persist the key, empty to keep it in memory only.
+        ttl (int): Seconds before a cached key is fetched again.
+    """
+
+    def __init__(self, path: str = default_cache_path, ttl: int = 12 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self.api_key = ""
+        self.fetched_at = 0.0
+        self.lock = threading.Lock()
+
+    def get(self, proxy_url: str = "", client: Client = None) -> str:
+        api_key = self.load()
+        if api_key:
+            return api_key
+        with self.fetch_lock():
+            api_key = self.load()
+            if not api_key:
+                api_key = get(proxy_url, client)
+                self.store(api_key)
+            return api_key
+
+    def refresh(self, stale_key: str, proxy_url: str = "", client: Client = None) -> str:
+        """
+        Replaces `stale_key` after the API rejected it. Workers that were rejected with the
+        same key share a single fetch.
+        """
+        with self.fetch_lock():
+            api_key = self.load()
+            if not api_key or api_key == stale_key:
+                api_key = get(proxy_url, client)
+                self.store(api_key)
+            return api_key
+
+    def call(self, fetch, proxy_url: str = "", client: Client = None):
+        """
+        Calls `fetch(api_key)` and retries it once with a fresh key if the response is 401.
+        """
+        api_key = self.get(proxy_url, client)
+        try:
+            return fetch(api_key)
+        except Exception as e:
+            if utils.get_status_code(e) != 401:
+                raise
+        api_key = self.refresh(api_key, proxy_url, client)
+        return fetch(api_key)
+
+    def load(self) -> str:
+        if self.api_key and time.time() - self.fetched_at < self.ttl:
+            return self.api_key
+        if not self.path or not os.path.exists(self.path):
+            return ""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                cached = fastjson.load(f)
+        except (OSError, ValueError):
+            return ""
+        if not cached.get("api_key") or time.time() - cached.get("fetched_at", 0) >= self.ttl:
+            return ""
+        self.api_key = cached["api_key"]
+        self.fetched_at = cached["fetched_at"]
+        return self.api_key
+
+    def store(self, api_key: str):
+        self.api_key = api_key
+        self.fetched_at = time.time()
+        if not self.path:
+            return
+        try:
+            make_parent_dir(self.path)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                fastjson.dump({"api_key": api_key, "fetched_at": self.fetched_at}, f)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def invalidate(self):
+        self.api_key = ""
+        self.fetched_at = 0.0
+        if self.path and os.path.exists(self.path):
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    @contextmanager
+    def fetch_lock(self):
+        # held while a key is fetched, by the threads of this process and by other processes
+        with self.lock, self.file_lock():
+            yield
+
+    @contextmanager
+    def file_lock(self):
+        if not self.path or fcntl is None:
+            yield
+            return
+        try:
+            make_parent_dir(self.path)
+            lock_file = open(f"{self.path}.lock", 'w')
+        except OSError:
+            yield
+            return
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+
+def make_parent_dir(path: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+key_cache = ApiKeyCache()
+
+def get_cached(proxy_url: str = "", client: Client = None) -> str:
+    return key_cache.get(proxy_url, client)
@@ -0,0 +1,471 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from urllib.parse import urlparse
+from curl_cffi.requests import AsyncSession
+import pyairbnb.api as api
+import pyairbnb.details as details
+import pyairbnb.reviews as reviews
+import pyairbnb.price as price
+import pyairbnb.search as search
+import pyairbnb.utils as utils
+import pyairbnb.standardize as standardize
+import pyairbnb.experience as experience
+import pyairbnb.calendarinfo as calendar
+import pyairbnb.host as host
+import pyairbnb.host_details as host_details
+import pyairbnb.tiles as tiles
+import pyairbnb.ratelimit as ratelimit
+import pyairbnb.proxypool as proxypool
+import pyairbnb.retry as retry
+import pyairbnb.cache as cache
+import pyairbnb.start as start
+
+
+async def timed(awaitable):
+    started_at = time.perf_counter()
+    result = await awaitable
+    return result, time.perf_counter() - started_at
+
+
+class AsyncAirbnbClient:
+    """
+    Asyncio version of the pyairbnb API built on a single curl_cffi AsyncSession.
+
+    Every coroutine builds its request with the same `prepare*` helpers used by the
+    blocking functions and parses the response with the same `parse*` helpers, so the
+    results are identical to the ones returned by the functions in start.py.
+
+    Args:
+        proxy_url (str): Proxy URL used for every request, the same as a pool of one proxy.
+        max_clients (int): Maximum number of requests in flight at the same time.
+        impersonate (str): Browser fingerprint to impersonate.
+        key_cache (ApiKeyCache): API key cache, the package wide one by default.
+        rate_limiter (RateLimiter): Throttling shared with other clients, by default the client gets its own
+            limiter whose concurrency starts and is capped at max_clients.
+        proxy_pool (ProxyPool): Proxies to spread the requests over with one session each, replaces proxy_url.
+        retry_policy (RetryPolicy): Retries of transient errors, retry.default_policy by default.
+        circuit_breaker (CircuitBreaker): Per endpoint circuit breaker, retry.shared_breaker by default.
+        response_cache (ResponseCache): On-disk cache of API responses, disabled by default.
+
+    Example:
+        async with AsyncAirbnbClient(max_clients=200) as client:
+            rooms = await client.search_all(...)
+    """
+
+    def __init__(self, proxy_url: str = "", max_clients: int = 100, impersonate: str = "chrome124", key_cache: api.ApiKeyCache = None,
+                 rate_limiter: ratelimit.RateLimiter = None, proxy_pool: proxypool.ProxyPool = None,
+                 retry_policy: retry.RetryPolicy = None, circuit_breaker: retry.CircuitBreaker = None,
+                 response_cache: cache.ResponseCache = None):
+        self.proxy_url = proxy_url
+        self.response_cache = response_cache
+        self.retry_policy = retry_policy or retry.default_policy
+        self.circuit_breaker = circuit_breaker or retry.shared_breaker
+        self.proxy_pool = proxy_pool or proxypool.ProxyPool([proxy_url])
+        # shared_limiter starts at a concurrency of 32, well below what an AsyncSession can keep in flight
+        self.rate_limiter = rate_limiter or ratelimit.RateLimiter(initial_concurrency=max_clients, max_concurrency=max_clients)
+        self.impersonate = impersonate
+        self.key_cache = key_cache or api.key_cache
+        self.api_key_lock = asyncio.Lock()
+        self.sessions = {
+            proxy: AsyncSession(max_clients=max_clients, proxies=utils.get_proxies(proxy), impersonate=impersonate, timeout=60)
+            for proxy in self.proxy_pool.proxy_urls
+        }
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        for session in self.sessions.values():
+            await session.close()
+
+    async def fetch(self, prepared, parse):
+        method, url, kwargs = prepared
+        if self.response_cache is not None:
+            # the cache is a SQLite file, its reads, writes and evictions run off the event loop
+            response = await asyncio.to_thread(self.response_cache.get, method, url, kwargs)
+            if response is None:
+                response = await self.request(method, url, **kwargs)
+                await asyncio.to_thread(self.response_cache.store, method, url, kwargs, response)
+            return parse(response)
+        return parse(await self.request(method, url, **kwargs))
+
+    async def request(self, method: str, url: str, **kwargs):
+        if self.impersonate:
+            kwargs["impersonate"] = self.impersonate
+        endpoint = ratelimit.endpoint_name(url)
+        attempt = 0
+        while True:
+            trial = self.circuit_breaker.check(endpoint)
+            try:
+                response = await self.send(endpoint, method, url, **kwargs)
+            except Exception as e:
+                if not self.retry_policy.is_transient(e):
+                    raise
+                self.circuit_breaker.record(endpoint, False)
+                attempt += 1
+                if attempt >= self.retry_policy.max_attempts:
+                    raise
+                await asyncio.sleep(self.retry_policy.delay(attempt - 1))
+                continue
+            else:
+                self.circuit_breaker.record(endpoint, not retry.is_failure(response.status_code))
+            finally:
+                # a trial ended by a non transient error or a cancellation was not recorded
+                self.circuit_breaker.end_trial(endpoint, trial)
+            attempt += 1
+            if not self.retry_policy.should_retry(response.status_code) or attempt >= self.retry_policy.max_attempts:
+                return response
+            await asyncio.sleep(self.retry_policy.delay(attempt - 1, response))
+
+    async def send(self, endpoint: str, method: str, url: str, **kwargs):
+        proxy_url = self.proxy_pool.choose()
+        try:
+            while True:
+                wait_time = self.rate_limiter.try_acquire(endpoint, proxy_url)
+                if wait_time == 0:
+                    break
+                await asyncio.sleep(wait_time)
+        except BaseException:
+            # cancelled while waiting for the rate limiter
+            self.proxy_pool.release(proxy_url)
+            raise
+        started_at = time.perf_counter()
+        status_code = 0
+        try:
+            response = await self.sessions[proxy_url].request(method, url, **kwargs)
+            status_code = response.status_code
+            return response
+        finally:
+            latency = time.perf_counter() - started_at
+            self.rate_limiter.release(endpoint, proxy_url, status_code, latency)
+            self.proxy_pool.record(proxy_url, proxypool.is_healthy_response(status_code), latency)
+
+    @asynccontextmanager
+    async def key_fetch_lock(self):
+        """
+        Single-flight of key fetches with the other coroutines of the client, then with the
+        threads and processes sharing key_cache through its fetch_lock.
+        """
+        async with self.api_key_lock:
+            lock = self.key_cache.fetch_lock()
+            acquire = asyncio.ensure_future(asyncio.to_thread(lock.__enter__))
+            try:
+                await asyncio.shield(acquire)
+            except asyncio.CancelledError:
+                # the thread keeps waiting for the lock, release it as soon as it has it
+                acquire.add_done_callback(lambda future: future.exception() is None and lock.__exit__(None, None, None))
+                raise
+            try:
+                yield
+            finally:
+                lock.__exit__(None, None, None)
+
+    async def get_api_key(self) -> str:
+        api_key = self.key_cache.load()
+        if api_key:
+            return api_key
+        async with self.key_fetch_lock():
+            api_key = self.key_cache.load()
+            if not api_key:
+                api_key = await self.fetch(api.prepare(), api.parse)
+                self.key_cache.store(api_key)
+            return api_key
+
+    async def refresh_api_key(self, stale_key: str) -> str:
+        async with self.key_fetch_lock():
+            api_key = self.key_cache.load()
+            if not api_key or api_key == stale_key:
+                api_key = await self.fetch(api.prepare(), api.parse)
+                self.key_cache.store(api_key)
+            return api_key
+
+    async def call_with_api_key(self, fetch):
+        """
+        Awaits `fetch(api_key)` with the cached key and retries it once with a fresh key if the response is 401.
+        """
+        api_key = await self.get_api_key()
+        try:
+            return await fetch(api_key)
+        except Exception as e:
+            if utils.get_status_code(e) != 401:
+                raise
+        api_key = await self.refresh_api_key(api_key)
+        return await fetch(api_key)
+
+    async def search_page(self, api_key: str, cursor: str, check_in: str, check_out: str, ne_lat: float, ne_long: float, sw_lat: float, sw_long: float,
+                          zoom_value: int, currency: str, place_type: str, price_min: int, price_max: int, amenities: list, language: str):
+        prepared = search.prepare(
+            api_key, cursor, check_in, check_out, ne_lat, ne_long, sw_lat, sw_long, zoom_value,
+            currency, place_type, price_min, price_max, amenities, language
+        )
+        return await self.fetch(prepared, search.parse)
+
+    async def search_all(self, check_in: str, check_out: str, ne_lat: float, ne_long: float, sw_lat: float, sw_long: float,
+                         zoom_value: int, price_min: int, price_max: int, place_type: str = "", amenities: list = [], currency: str = "USD", language: str = "en"):
+        """
+        Async version of start.search_all.
+        """
+        all_results = []
+        try:
+            async for result in self.iter_search(
+                check_in, check_out, ne_lat, ne_long, sw_lat, sw_long, zoom_value, price_min, price_max,
+                place_type, amenities, currency, language, prefetch=False
+            ):
+                all_results.append(result)
+        except Exception as e:
+            if not all_results:
+                raise
+            raise utils.PartialResultsError(e, all_results) from e
+        return all_results
+
+    async def iter_search(self, check_in: str, check_out: str, ne_lat: float, ne_long: float, sw_lat: float, sw_long: float,
+                          zoom_value: int, price_min: int, price_max: int, place_type: str = "", amenities: list = [], currency: str = "USD", language: str = "en",
+                          prefetch: bool = True):
+        """
+        Async iterator version of start.iter_search, with prefetch the next page is requested
+        in a task while the listings of the current one are consumed.
+        """
+        def fetch_page(cursor):
+            return self.call_with_api_key(
+                lambda api_key: self.search_page(
+                    api_key, cursor, check_in, check_out, ne_lat, ne_long, sw_lat, sw_long, zoom_value,
+                    currency, place_type, price_min, price_max, amenities, language
+                )
+            )
+
+        next_page = None
+        try:
+            results_raw = await fetch_page("")
+            while True:
+                results = standardize.from_search(results_raw.get("searchResults", []))
+                cursor = results_raw["paginationInfo"].get("nextPageCursor")
+                if not results or cursor is None:
+                    for result in results:
+                        yield result
+                    return
+                next_page = asyncio.ensure_future(fetch_page(cursor)) if prefetch else None
+                for result in results:
+                    yield result
+                results_raw = await next_page if next_page else await fetch_page(cursor)
+                next_page = None
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def search_all_tiled(self, check_in: str, check_out: str, ne_lat: float, ne_long: float, sw_lat: float, sw_long: float,
+                               zoom_value: int, price_min: int, price_max: int, place_type: str = "", amenities: list = [], currency: str = "USD", language: str = "en",
+                               saturation_threshold: int = 270, max_depth: int = 6):
+        """
+        Async version of start.search_all_tiled, every tile of a level is searched concurrently.
+        """
+        coverage = tiles.Coverage(saturation_threshold, max_depth)
+        level = [tiles.new_tile(ne_lat, ne_long, sw_lat, sw_long, zoom_value)]
+        while level:
+            pages = await asyncio.gather(*[
+                self.search_all(
+                    check_in, check_out, tile["ne_lat"], tile["ne_long"], tile["sw_lat"], tile["sw_long"], tile["zoom_value"],
+                    price_min, price_max, place_type, amenities, currency, language
+                )
+                for tile in level
+            ], return_exceptions=True)
+            next_level = []
+            for tile, results in zip(level, pages):
+                if isinstance(results, Exception):
+                    coverage.fail(tile, results)
+                    continue
+                next_level.extend(coverage.add(tile, results))
+            level = next_level
+        if coverage.errors:
+            raise utils.PartialResultsError(coverage.errors[0], (coverage.results(), coverage.stats)) from coverage.errors[0]
+        return coverage.results(), coverage.stats
+
+    async def search_first_page(self, check_in: str, check_out: str, ne_lat: float, ne_long: float, sw_lat: float, sw_long: float,
+                                zoom_value: int, price_min: int, price_max: int, place_type: str = "", amenities: list = [], currency: str = "USD", language: str = "en"):
+        """
+        Async version of start.search_first_page.
+        """
+        results_raw = await self.call_with_api_key(
+            lambda api_key: self.search_page(
+                api_key, "", check_in, check_out, ne_lat, ne_long, sw_lat, sw_long, zoom_value,
+                currency, place_type, price_min, price_max, amenities, language
+            )
+        )
+        return standardize.from_search(results_raw.get("searchResults", []))
+
+    async def get_markets(self, currency: str, locale: str, api_key: str):
+        return await self.fetch(search.prepare_markets(currency, locale, api_key), search.parse_markets)
+
+    async def get_places_ids(self, country: str, location_name: str, currency: str, locale: str, config_token: str, api_key: str):
+        prepared = search.prepare_places_ids(country, location_name, currency, locale, config_token, api_key)
+        return await self.fetch(prepared, search.parse_places_ids)
+
+    async def get_metadata_from_url(self, room_url: str, language: str):
+        return await self.fetch(details.prepare(room_url, language), details.parse_response)
+
+    async def get_calendar(self, api_key: str = "", room_id: str = ""):
+        """
+        Async version of start.get_calendar.
+        """
+        current_month = datetime.now().month
+        current_year = datetime.now().year
+        if api_key:
+            return await self.fetch(calendar.prepare(api_key, room_id, current_month, current_year), calendar.parse)
+        return await self.call_with_api_key(
+            lambda api_key: self.fetch(calendar.prepare(api_key, room_id, current_month, current_year), calendar.parse)
+        )
+
+    async def get_reviews_from_product_id(self, api_key: str, product_id: str, currency: str = "USD", language: str = "en"):
+        offset = 0
+        all_reviews = []
+        while True:
+            prepared = reviews.prepare_from_offset(api_key, offset, product_id, currency, language)
+            try:
+                page = await self.fetch(prepared, reviews.parse_from_offset)
+            except Exception as e:
+                if not all_reviews:
+                    raise
+                raise utils.PartialResultsError(e, all_reviews) from e
+            offset = offset + 50
+            if len(page) == 0:
+                break
+            all_reviews.extend(page)
+        return all_reviews
+
+    async def get_reviews(self, room_url: str, language: str = "en"):
+        """
+        Async version of start.get_reviews.
+        """
+        data, price_input, cookies = await self.get_metadata_from_url(room_url, language)
+        return await self.get_reviews_from_product_id(price_input["api_key"], price_input["product_id"], "USD", language)
+
+    async def get_price(self, api_key: str, cookies, impresion_id: str, product_id: str, check_in: str, check_out: str, adults: int, currency: str, language: str):
+        prepared = price.prepare(api_key, cookies, impresion_id, product_id, check_in, check_out, adults, currency, language)
+        return await self.fetch(prepared, price.parse)
+
+    async def get_host_details(self, api_key: str, cookies, host_id: str, language: str):
+        return await self.fetch(host_details.prepare(api_key, cookies, host_id, language), host_details.parse)
+
+    async def get_listings_from_user(self, user_id: int, api_key: str):
+        offset = 0
+        all_listings = []
+        while True:
+            try:
+                listings = await self.fetch(host.prepare_listings_from_offset(offset, user_id, api_key), host.parse_listings)
+            except Exception as e:
+                if not all_listings:
+                    raise
+                raise utils.PartialResultsError(e, all_listings) from e
+            offset = offset + len(listings)
+            if len(listings) == 0:
+                break
+            all_listings = all_listings + listings
+        return all_listings
+
+    async def get_details(self, room_url: str = None, room_id: int = None, domain: str = "www.airbnb.com", check_in: str = None, check_out: str = None,
+                          adults: int = 1, currency: str = "USD", language: str = "en", sections: list = start.detail_sections):
+        """
+        Async version of start.get_details. Reviews, calendar, price and host details
+        are requested concurrently once the room page has been parsed, "timings" holds the
+        seconds spent on each section.
+        """
+        if not room_url and room_id is None:
+            raise ValueError("Either room_url or room_id must be provided.")
+
+        if not room_url:
+            room_url = f"https://{domain}/rooms/{room_id}"
+
+        started_at = time.perf_counter()
+        data, price_input, cookies = await self.get_metadata_from_url(room_url, language)
+        timings = {"details": time.perf_counter() - started_at}
+        product_id = price_input["product_id"]
+        api_key = price_input["api_key"]
+
+        if room_id is None:
+            room_id = urlparse(room_url).path.split("/")[-1]
+
+        tasks = {}
+        if "reviews" in sections:
+            tasks["reviews"] = self.get_reviews_from_product_id(api_key, product_id, currency, language)
+        if "calendar" in sections:
+            tasks["calendar"] = self.get_calendar(api_key, room_id)
+        if "host_details" in sections:
+            tasks["host_details"] = self.get_host_details(api_key, cookies, data["host"]["id"], language)
+        if "price" in sections and check_in and check_out:
+            tasks["price"] = self.get_price(
+                api_key, cookies, price_input["impression_id"], product_id, check_in, check_out, adults, currency, language
+            )
+        results = await asyncio.gather(*[timed(task) for task in tasks.values()])
+        for name, (result, elapsed) in zip(tasks.keys(), results):
+            data[name] = result
+            timings[name] = elapsed
+        timings["total"] = time.perf_counter() - started_at
+        data["timings"] = timings
+        return data
+
+    async def get_details_many(self, room_ids, concurrency: int = 64, sections: list = start.detail_sections, domain: str = "www.airbnb.com",
+                               check_in: str = None, check_out: str = None, adults: int = 1, currency: str = "USD", language: str = "en"):
+        """
+        Async version of start.get_details_many, an async generator of (room_id, data, error)
+        tuples in completion order.
+        """
+        async def fetch(room_id):
+            try:
+                data = await self.get_details(
+                    room_id=room_id, domain=domain, check_in=check_in, check_out=check_out, adults=adults,
+                    currency=currency, language=language, sections=sections
+                )
+                return room_id, data, None
+            except Exception as e:
+                return room_id, None, e
+
+        room_ids = iter(room_ids)
+        pending = set()
+        while True:
+            for room_id in room_ids:
+                pending.add(asyncio.ensure_future(fetch(room_id)))
+                if len(pending) >= concurrency:
+                    break
+            if not pending:
+                return
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+
+    async def experience_search_by_place_id(self, cursor: str, place_id: str, location_name: str, currency: str, locale: str, check_in: str, check_out: str, api_key: str):
+        prepared = experience.prepare_search_by_place_id(cursor, place_id, location_name, currency, locale, check_in, check_out, api_key)
+        return await self.fetch(prepared, experience.parse_search_by_place_id)
+
+    async def experience_search(self, user_input_text: str, currency: str, locale: str, check_in: str, check_out: str, api_key: str):
+        """
+        Async version of start.search_experience_by_taking_the_first_inputs_i_dont_care.
+        """
+        markets_data = await self.get_markets(currency, locale, api_key)
+        markets = utils.get_nested_value(markets_data, "user_markets", [])
+        if len(markets) == 0:
+            raise Exception("markets are empty")
+        config_token = utils.get_nested_value(markets[0], "satori_parameters", "")
+        country_code = utils.get_nested_value(markets[0], "country_code", "")
+        if config_token == "" or country_code == "":
+            raise Exception("config_token or country_code are empty")
+        place_ids_results = await self.get_places_ids(country_code, user_input_text, currency, locale, config_token, api_key)
+        if len(place_ids_results) == 0:
+            raise Exception("empty places ids")
+        place_id = utils.get_nested_value(place_ids_results[0], "location.google_place_id", "")
+        location_name = utils.get_nested_value(place_ids_results[0], "location.location_name", "")
+        if place_id == "" or location_name == "":
+            raise Exception("place_id or location_name are empty")
+        result, cursor = await self.experience_search_by_place_id("", place_id, location_name, currency, locale, check_in, check_out, api_key)
+        while cursor != "":
+            try:
+                result_tmp, cursor = await self.experience_search_by_place_id(cursor, place_id, location_name, currency, locale, check_in, check_out, api_key)
+            except Exception as e:
+                raise utils.PartialResultsError(e, result) from e
+            if len(result_tmp) == 0:
+                break
+            result = result + result_tmp
+        return result
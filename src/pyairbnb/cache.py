@@ -0,0 +1,173 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urlparse
+import pyairbnb.ratelimit as ratelimit
+import pyairbnb.fastjson as fastjson
+
+default_cache_path = os.path.join(os.path.expanduser("~"), ".cache", "pyairbnb", "responses.sqlite")
+
+default_ttls = {
+    "StaysSearch": 15 * 60,
+    "PdpAvailabilityCalendar": 60 * 60,
+    "StaysPdpSections": 30 * 60,
+    "StaysPdpReviewsQuery": 24 * 60 * 60,
+    "GetUserProfile": 24 * 60 * 60,
+    "UserProfileBeehiveListingQuery": 24 * 60 * 60,
+    "ExperiencesSearch": 60 * 60,
+}
+
+# Search filters that get a new value on every call without changing the response, like the
+# session id of ExperiencesSearch, they are left out of the cache key
+volatile_filters = ("federatedSearchSessionId",)
+
+
+def stable_body(value):
+    if isinstance(value, dict):
+        return {key: stable_body(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [stable_body(item) for item in value if not (isinstance(item, dict) and item.get("filterName") in volatile_filters)]
+    return value
+
+
+class CachedResponse:
+    """
+    Response served from the cache, it has the attributes of a curl_cffi Response that
+    the parse functions use.
+    """
+
+    def __init__(self, url: str, status_code: int, content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = {}
+        self.cookies = {}
+        self.from_cache = True
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return fastjson.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise Exception(f"HTTP Error {self.status_code} (cached)")
+
+
+class ResponseCache:
+    """
+    Optional on-disk cache of API responses.
+
+    Airbnb API calls are persisted GraphQL queries, so their response only depends on the
+    operation, its hash and its variables, all of them part of the URL or the JSON body.
+    Successful responses of /api/v3/ operations are stored zlib compressed in a SQLite file
+    keyed by a hash of method, URL, params and body (without the volatile_filters), and served again until the TTL of their
+    operation expires. When the file grows over `max_bytes`, the least recently used
+    responses are evicted.
+
+    Args:
+        path (str): SQLite file, ":memory:" to keep the cache in memory.
+        ttls (dict): Seconds to keep the responses of each operation, see default_ttls.
+        default_ttl (int): Seconds to keep the responses of operations not in `ttls`, 0 to not cache them.
+        max_bytes (int): Maximum size of the stored (compressed) responses.
+    """
+
+    def __init__(self, path: str = default_cache_path, ttls: dict = None, default_ttl: int = 15 * 60, max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.ttls = dict(default_ttls, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self.lock = threading.Lock()
+        directory = os.path.dirname(path) if path != ":memory:" else ""
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                operation TEXT,
+                status_code INTEGER,
+                body BLOB,
+                size INTEGER,
+                expires_at REAL,
+                accessed_at REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self.conn.commit()
+        self.size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def ttl(self, url: str) -> int:
+        if not urlparse(url).path.startswith("/api/v3/"):
+            return 0
+        return self.ttls.get(ratelimit.endpoint_name(url), self.default_ttl)
+
+    def key(self, method: str, url: str, kwargs: dict) -> str:
+        data = kwargs.get("data")
+        if isinstance(data, bytes) and any(name.encode() in data for name in volatile_filters):
+            data = stable_body(fastjson.loads(data))
+        request = [method, url, kwargs.get("params"), stable_body(kwargs.get("json")), data]
+        return hashlib.sha256(fastjson.dumps_bytes(request, sort_keys=True, default=str)).hexdigest()
+
+    def get(self, method: str, url: str, kwargs: dict):
+        if self.ttl(url) <= 0:
+            return None
+        key = self.key(method, url, kwargs)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT status_code, body, expires_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or row[2] < now:
+                self.stats["misses"] += 1
+                return None
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.stats["hits"] += 1
+        return CachedResponse(url, row[0], zlib.decompress(row[1]))
+
+    def store(self, method: str, url: str, kwargs: dict, response):
+        ttl = self.ttl(url)
+        if ttl <= 0 or response.status_code != 200:
+            return
+        key = self.key(method, url, kwargs)
+        body = zlib.compress(response.content, 6)
+        now = time.time()
+        with self.lock:
+            previous = self.conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, operation, status_code, body, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, ratelimit.endpoint_name(url), response.status_code, body, len(body), now + ttl, now),
+            )
+            self.size += len(body) - (previous[0] if previous else 0)
+            self.stats["stores"] += 1
+            if self.size > self.max_bytes:
+                self.evict()
+            self.conn.commit()
+
+    def evict(self):
+        # Expired responses go first, then the least recently used ones until 90% of max_bytes
+        self.conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+        self.size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        target = self.max_bytes * 0.9
+        rows = self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall()
+        for key, size in rows:
+            if self.size <= target:
+                break
+            self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.size -= size
+            self.stats["evictions"] += 1
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+            self.size = 0
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -1,12 +1,17 @@
-from curl_cffi import requests
+from pyairbnb.client import Client, get_client
 import pyairbnb.utils as utils
 from urllib.parse import urlencode
-import json
+import pyairbnb.fastjson as fastjson
 
 ep = "https://www.airbnb.com/api/v3/PdpAvailabilityCalendar/8f08e03c7bd16fcad3c92a3592c19a8b559a0d0855a84028d1163d4733ed9ade/"
  
 
-def get(api_key: str, room_id: str, month: int, year: int, proxy_url: str) -> str:
+def get(api_key: str, room_id: str, month: int, year: int, proxy_url: str, client: Client = None) -> str:
+    method, url, kwargs = prepare(api_key, room_id, month, year)
+    response = get_client(client, proxy_url).request(method, url, **kwargs)
+    return parse(response)
+
+def prepare(api_key: str, room_id: str, month: int, year: int):
     headers = {
             "Accept": "application/json",
             "Content-Type": "application/json",
@@ -27,8 +32,8 @@ def get(api_key: str, room_id: str, month: int, year: int, proxy_url: str) -> st
             "sha256Hash": "8f08e03c7bd16fcad3c92a3592c19a8b559a0d0855a84028d1163d4733ed9ade",
         },
     }
-    dataRawExtension = json.dumps(entension)
-    dataRawVariables = json.dumps(variablesData)
+    dataRawExtension = fastjson.dumps(entension)
+    dataRawVariables = fastjson.dumps(variablesData)
     query = {
         "operationName": "PdpAvailabilityCalendar",
         "locale": "en",
@@ -37,11 +42,10 @@ def get(api_key: str, room_id: str, month: int, year: int, proxy_url: str) -> st
         "extensions": dataRawExtension,
     }
     url = f"{ep}?{urlencode(query)}"
-    proxies = {}
-    if proxy_url:
-        proxies = {"http": proxy_url, "https": proxy_url}
-    response = requests.get(url, headers=headers, proxies=proxies, timeout=60)
+    return "GET", url, {"headers": headers, "timeout": 60}
+
+def parse(response):
     response.raise_for_status() 
-    data = response.json()
+    data = fastjson.loads(response.content)
     calendar = utils.get_nested_value(data,"data.merlin.pdpAvailabilityCalendar.calendarMonths",[])
     return calendar
\ No newline at end of file
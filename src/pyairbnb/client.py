@@ -0,0 +1,162 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from curl_cffi import requests
+from curl_cffi import CurlOpt
+import pyairbnb.utils as utils
+import pyairbnb.ratelimit as ratelimit
+import pyairbnb.proxypool as proxypool
+import pyairbnb.retry as retry
+import pyairbnb.cache as cache
+
+
+class Client:
+    """
+    Reusable HTTP client that every pyairbnb function accepts through its `client` argument.
+
+    The client owns one curl_cffi Session per proxy, so connections are kept alive and reused
+    between calls, cookies set by one response are sent with the following requests through
+    the same proxy and every request goes out with the same impersonation profile. With a
+    proxy pool, each request is routed to the healthiest proxy of the pool.
+
+    Args:
+        proxy_url (str): Proxy URL used for every request, the same as a pool of one proxy.
+        impersonate (str): Browser fingerprint to impersonate.
+        timeout (int): Default timeout in seconds for requests that don't set one.
+        max_connections (int): Maximum number of idle connections kept open per worker thread.
+        rate_limiter (RateLimiter): Throttling shared with other clients, ratelimit.shared_limiter by default.
+        proxy_pool (ProxyPool): Proxies to spread the requests over, replaces proxy_url.
+        retry_policy (RetryPolicy): Retries of transient errors, retry.default_policy by default.
+        circuit_breaker (CircuitBreaker): Per endpoint circuit breaker, retry.shared_breaker by default.
+        response_cache (ResponseCache): On-disk cache of API responses, disabled by default.
+        workers (int): Threads of the executor that runs the sub-requests of get_details.
+
+    Example:
+        with pyairbnb.Client(proxy_url=proxy_url, max_connections=20) as client:
+            rooms = pyairbnb.search_all(..., client=client)
+            data = pyairbnb.get_details(room_id=rooms[0]["room_id"], client=client)
+    """
+
+    def __init__(self, proxy_url: str = "", impersonate: str = "chrome124", timeout: int = 60, max_connections: int = 10,
+                 rate_limiter: ratelimit.RateLimiter = None, proxy_pool: proxypool.ProxyPool = None,
+                 retry_policy: retry.RetryPolicy = None, circuit_breaker: retry.CircuitBreaker = None,
+                 response_cache: cache.ResponseCache = None, workers: int = 4):
+        self.proxy_url = proxy_url
+        self.response_cache = response_cache
+        self.retry_policy = retry_policy or retry.default_policy
+        self.circuit_breaker = circuit_breaker or retry.shared_breaker
+        self.proxy_pool = proxy_pool or proxypool.ProxyPool([proxy_url])
+        self.rate_limiter = rate_limiter or ratelimit.shared_limiter
+        self.impersonate = impersonate
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.sessions = {proxy: self.new_session(proxy) for proxy in self.proxy_pool.proxy_urls}
+        self.session = self.sessions[self.proxy_pool.proxy_urls[0]]
+        self.workers = workers
+        self.executor = None
+        self.executor_lock = threading.Lock()
+
+    def new_session(self, proxy_url: str):
+        return requests.Session(
+            proxies=utils.get_proxies(proxy_url),
+            impersonate=self.impersonate,
+            timeout=self.timeout,
+            curl_options={CurlOpt.MAXCONNECTS: self.max_connections},
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def cookies(self):
+        return self.session.cookies
+
+    def request(self, method: str, url: str, **kwargs):
+        if self.response_cache is not None:
+            response = self.response_cache.get(method, url, kwargs)
+            if response is None:
+                response = self.request_network(method, url, **kwargs)
+                self.response_cache.store(method, url, kwargs, response)
+            return response
+        return self.request_network(method, url, **kwargs)
+
+    def request_network(self, method: str, url: str, **kwargs):
+        if self.impersonate:
+            kwargs["impersonate"] = self.impersonate
+        endpoint = ratelimit.endpoint_name(url)
+        attempt = 0
+        while True:
+            trial = self.circuit_breaker.check(endpoint)
+            try:
+                response = self.send(endpoint, method, url, **kwargs)
+            except Exception as e:
+                if not self.retry_policy.is_transient(e):
+                    raise
+                self.circuit_breaker.record(endpoint, False)
+                attempt += 1
+                if attempt >= self.retry_policy.max_attempts:
+                    raise
+                time.sleep(self.retry_policy.delay(attempt - 1))
+                continue
+            else:
+                self.circuit_breaker.record(endpoint, not retry.is_failure(response.status_code))
+            finally:
+                # a trial ended by a non transient error or a cancellation was not recorded
+                self.circuit_breaker.end_trial(endpoint, trial)
+            attempt += 1
+            if not self.retry_policy.should_retry(response.status_code) or attempt >= self.retry_policy.max_attempts:
+                return response
+            time.sleep(self.retry_policy.delay(attempt - 1, response))
+
+    def send(self, endpoint: str, method: str, url: str, **kwargs):
+        proxy_url = self.proxy_pool.choose()
+        try:
+            self.rate_limiter.acquire(endpoint, proxy_url)
+        except BaseException:
+            self.proxy_pool.release(proxy_url)
+            raise
+        started_at = time.perf_counter()
+        status_code = 0
+        try:
+            response = self.sessions[proxy_url].request(method, url, **kwargs)
+            status_code = response.status_code
+            return response
+        finally:
+            latency = time.perf_counter() - started_at
+            self.rate_limiter.release(endpoint, proxy_url, status_code, latency)
+            self.proxy_pool.record(proxy_url, proxypool.is_healthy_response(status_code), latency)
+
+    def get_executor(self) -> ThreadPoolExecutor:
+        # curl_cffi keeps a curl handle per thread, the executor lives as long as the client
+        # so its threads keep their connections open between calls
+        with self.executor_lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pyairbnb")
+            return self.executor
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        for session in self.sessions.values():
+            session.close()
+
+
+default_clients = {}
+default_clients_lock = threading.Lock()
+
+def get_client(client: Client = None, proxy_url: str = "") -> Client:
+    """
+    Returns `client` when given, otherwise a shared Client for `proxy_url`, so that callers
+    that only pass a proxy URL still reuse connections between calls.
+    """
+    if client is not None:
+        return client
+    proxy_url = proxy_url or ""
+    with default_clients_lock:
+        if proxy_url not in default_clients:
+            default_clients[proxy_url] = Client(proxy_url)
+        return default_clients[proxy_url]
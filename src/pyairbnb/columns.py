@@ -0,0 +1,113 @@
+from array import array
+
+nan = float("nan")
+
+# Scalar columns of SearchColumns and their array typecode, "" for string columns kept in lists
+scalar_columns = {
+    "room_id": "q",
+    "category": "",
+    "kind": "",
+    "name": "",
+    "title": "",
+    "type": "",
+    "latitude": "d",
+    "longitude": "d",
+    "price_qualifier": "",
+    "price_currency_symbol": "",
+    "price_amount": "d",
+    "price_discount": "d",
+    "price_total": "d",
+    "price_total_currency_symbol": "",
+    "cleaning_fee": "d",
+    "airbnb_fee": "d",
+    "long_stay_discount": "d",
+    "rating": "d",
+    "review_count": "q",
+}
+
+# Child columns, each list column has an offsets column with one more entry than listings:
+# the values of listing i are values[offsets[i]:offsets[i+1]]
+child_columns = {
+    "badges": {"badges": ""},
+    "images": {"image_url": ""},
+    "break_down": {"break_down_description": "", "break_down_amount": "d", "break_down_currency": ""},
+}
+
+
+def new_column(typecode: str):
+    return array(typecode) if typecode else []
+
+
+class SearchColumns:
+    """
+    Search results stored by column instead of one nested dict per listing.
+
+    Numeric columns are typed arrays (int64 for ids and counts, float64 for coordinates,
+    prices and ratings, NaN when a listing has no value), strings are lists. review_count is
+    0 for listings without reviews. Badges, images and price break downs are flattened into
+    child columns indexed by an offsets column.
+    The numeric buffers are shared, not copied, by to_numpy and to_arrow, and an array can't
+    grow while a view of its buffer is alive: appending after an export raises BufferError
+    unless the export was made with copy=True.
+    """
+
+    def __init__(self):
+        self.columns = {name: new_column(typecode) for name, typecode in scalar_columns.items()}
+        self.offsets = {}
+        for child, columns in child_columns.items():
+            self.offsets[child] = array("q", [0])
+            for name, typecode in columns.items():
+                self.columns[name] = new_column(typecode)
+
+    def __len__(self) -> int:
+        return len(self.columns["room_id"])
+
+    def close_children(self):
+        for child, columns in child_columns.items():
+            self.offsets[child].append(len(self.columns[next(iter(columns))]))
+
+    def to_numpy(self, copy: bool = False) -> dict:
+        """
+        Returns the columns as a dict of NumPy arrays, string columns as object arrays and
+        offsets as "<child>_offsets". With copy the arrays own their data and more pages can
+        still be appended to the columns. Requires numpy.
+        """
+        import numpy as np
+
+        def to_array(column):
+            values = np.frombuffer(column, dtype=np.int64 if column.typecode == "q" else np.float64)
+            return values.copy() if copy else values
+
+        result = {}
+        for name, column in self.columns.items():
+            if isinstance(column, array):
+                result[name] = to_array(column)
+            else:
+                result[name] = np.array(column, dtype=object)
+        for child, offsets in self.offsets.items():
+            result[f"{child}_offsets"] = to_array(offsets)
+        return result
+
+    def to_arrow(self, copy: bool = False):
+        """
+        Returns the columns as a pyarrow Table with one row per listing, child columns become
+        large_list columns built on the offsets. With copy the table owns its data and more
+        pages can still be appended to the columns. Requires pyarrow.
+        """
+        import pyarrow as pa
+
+        def to_buffer(column):
+            return pa.py_buffer(column.tobytes() if copy else column)
+
+        def to_array(column):
+            if isinstance(column, array):
+                arrow_type = pa.int64() if column.typecode == "q" else pa.float64()
+                return pa.Array.from_buffers(arrow_type, len(column), [None, to_buffer(column)])
+            return pa.array(column, type=pa.string())
+
+        arrays = {name: to_array(self.columns[name]) for name in scalar_columns}
+        for child, columns in child_columns.items():
+            offsets = pa.Array.from_buffers(pa.int64(), len(self.offsets[child]), [None, to_buffer(self.offsets[child])])
+            for name in columns:
+                arrays[name] = pa.LargeListArray.from_arrays(offsets, to_array(self.columns[name]))
+        return pa.table(arrays)
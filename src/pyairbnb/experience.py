@@ -1,9 +1,8 @@
-from curl_cffi import requests
+from pyairbnb.client import Client, get_client
 from urllib.parse import urlencode
 import pyairbnb.utils as utils
-import pyairbnb.search as search
 import uuid
-import json
+import pyairbnb.fastjson as fastjson
 
 ep_search = "https://www.airbnb.com/api/v3/ExperiencesSearch/fbbf9989cdf264a11fce48073008bb557f7f6b43961ccda5df6a8d988bd6ef36"
 headers = {
@@ -11,7 +10,6 @@ headers = {
     "Accept-Language": "en",
     "Cache-Control": "no-cache",
     "content-type": "application/json",
-    "Connection": "close",
     "Pragma": "no-cache",
     "Sec-Ch-Ua": '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
     "Sec-Ch-Ua-Mobile": "?0",
@@ -23,7 +21,12 @@ headers = {
     "Upgrade-Insecure-Requests": "1",
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 }
-def search_by_place_id(cursor: str, place_id: str, location_name: str, currency:str, locale: str, check_in:str, check_out:str, api_key:str, proxy_url:str):
+def search_by_place_id(cursor: str, place_id: str, location_name: str, currency:str, locale: str, check_in:str, check_out:str, api_key:str, proxy_url:str, client: Client = None):
+    method, url, kwargs = prepare_search_by_place_id(cursor, place_id, location_name, currency, locale, check_in, check_out, api_key)
+    response = get_client(client, proxy_url).request(method, url, **kwargs)
+    return parse_search_by_place_id(response)
+
+def prepare_search_by_place_id(cursor: str, place_id: str, location_name: str, currency:str, locale: str, check_in:str, check_out:str, api_key:str):
     query_params = {
         "operationName": "ExperiencesSearch",
         "locale": locale,
@@ -80,13 +83,11 @@ def search_by_place_id(cursor: str, place_id: str, location_name: str, currency:
         inputData["variables"]["experiencesSearchRequest"]["cursor"] = cursor
     headers_copy = headers.copy()
     headers_copy["X-Airbnb-Api-Key"] = api_key
-    proxies = {}
-    if proxy_url:
-        proxies = {"http": proxy_url, "https": proxy_url}
-    response = requests.post(url_parsed, json = inputData, headers=headers_copy, proxies=proxies,  impersonate="chrome124")
-    if response.status_code != 200:
-        raise Exception("Not corret status code: ", response.status_code, " response body: ",response.text)
-    data = response.json()
+    return "POST", url_parsed, {"data": fastjson.dumps_bytes(inputData), "headers": headers_copy, "impersonate": "chrome124"}
+
+def parse_search_by_place_id(response):
+    utils.check_status(response)
+    data = fastjson.loads(response.content)
     to_return=utils.get_nested_value(data,"data.presentation.experiencesSearch.results.searchResults",{})
     cursor=utils.get_nested_value(data,"data.presentation.experiencesSearch.results.paginationInfo.nextPageCursor","")
     return to_return,cursor
\ No newline at end of file
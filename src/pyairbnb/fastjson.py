@@ -0,0 +1,77 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# JSON encoding and decoding used across the package: orjson when it is installed, the
+# standard library otherwise. Both backends produce compact UTF-8 output.
+backend = "orjson" if orjson is not None else "json"
+
+# Standard library decoder for raw_decode, orjson only decodes whole documents
+decoder = json.JSONDecoder()
+
+# orjson.JSONDecodeError is a subclass of it, so it catches decoding errors of both backends
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data):
+    """
+    Decodes a JSON document given as str or bytes.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def raw_decode(text: str, index: int = 0):
+    """
+    Decodes the JSON value starting at index of a string, the text after it is ignored.
+
+    Returns:
+        tuple: The value and the index where it ends.
+    """
+    return decoder.raw_decode(text, index)
+
+def dumps_bytes(value, sort_keys: bool = False, indent: bool = False, default=None) -> bytes:
+    """
+    Encodes a value as UTF-8 JSON bytes.
+
+    Args:
+        sort_keys (bool): Sorts the keys of every object, for stable hashes.
+        indent (bool): Indents with 2 spaces for human readable files.
+        default (callable): Converts values the backend can't encode.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(value, default=default, option=option)
+    return dumps_std(value, sort_keys, indent, default).encode("utf-8")
+
+def dumps(value, sort_keys: bool = False, indent: bool = False, default=None) -> str:
+    """
+    Encodes a value as a JSON string, see dumps_bytes.
+    """
+    if orjson is not None:
+        return dumps_bytes(value, sort_keys, indent, default).decode("utf-8")
+    return dumps_std(value, sort_keys, indent, default)
+
+def dumps_std(value, sort_keys: bool, indent: bool, default) -> str:
+    if indent:
+        return json.dumps(value, sort_keys=sort_keys, indent=2, ensure_ascii=False, default=default)
+    return json.dumps(value, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False, default=default)
+
+def load(f):
+    """
+    Decodes the JSON document of a file opened in text or binary mode.
+    """
+    return loads(f.read())
+
+def dump(value, f, indent: bool = False):
+    """
+    Encodes a value into a file opened in binary mode.
+    """
+    f.write(dumps_bytes(value, indent=indent))
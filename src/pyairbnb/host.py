@@ -1,7 +1,7 @@
-from curl_cffi import requests
+from pyairbnb.client import Client, get_client
 from urllib.parse import urlencode
 import pyairbnb.utils as utils
-import json
+import pyairbnb.fastjson as fastjson
 
 ep = "https://www.airbnb.com/api/v3/UserProfileBeehiveListingQuery/529ca816b8be0619618d48b31bf46c379543e297fd68c0a953922927e5497b43"
 
@@ -12,26 +12,36 @@ extension = {
     }
 }
 
-extensionRaw = json.dumps(extension)
+extensionRaw = fastjson.dumps(extension)
         
-def get_listings_from_user(userId: int, api_key: str, proxy_url: str):
+def get_listings_from_user(userId: int, api_key: str, proxy_url: str, client: Client = None):
     offset = 0
     all_listings = []
     while True:
-        listings = get_listings_from_offset(offset, userId, api_key, proxy_url)
+        try:
+            listings = get_listings_from_offset(offset, userId, api_key, proxy_url, client)
+        except Exception as e:
+            if not all_listings:
+                raise
+            raise utils.PartialResultsError(e, all_listings) from e
         offset = offset + len(listings)
         if len(listings)==0:
             break
         all_listings = all_listings + listings
     return all_listings
 
-def get_listings_from_offset(offset: int, userId: int, api_key: str, proxy_url: str) -> str:
+def get_listings_from_offset(offset: int, userId: int, api_key: str, proxy_url: str, client: Client = None) -> str:
+    method, url, kwargs = prepare_listings_from_offset(offset, userId, api_key)
+    response = get_client(client, proxy_url).request(method, url, **kwargs)
+    return parse_listings(response)
+
+def prepare_listings_from_offset(offset: int, userId: int, api_key: str):
     variables = {
         "userId": userId,
         "limit": 12,
         "offset": offset,
     }
-    variablesRaw = json.dumps(variables)
+    variablesRaw = fastjson.dumps(variables)
     query_params = {
             "operationName": "UserProfileBeehiveListingQuery",
             "locale": "en",
@@ -40,7 +50,6 @@ def get_listings_from_offset(offset: int, userId: int, api_key: str, proxy_url:
             "extensions":extensionRaw,
     }
     url_parsed = f"{ep}?{urlencode(query_params)}"
-    proxies = {"http": proxy_url, "https": proxy_url} if proxy_url else None
     headers = {
         "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
         "Accept-Language": "en",
@@ -57,8 +66,10 @@ def get_listings_from_offset(offset: int, userId: int, api_key: str, proxy_url:
         "Upgrade-Insecure-Requests": "1",
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
     }
-    response = requests.get(url_parsed, headers=headers, proxies=proxies, timeout=60)  
+    return "GET", url_parsed, {"headers": headers, "timeout": 60}
+
+def parse_listings(response):
     response.raise_for_status() 
-    data = response.json()
+    data = fastjson.loads(response.content)
     listings = utils.get_nested_value(data,"data.beehive.getListOfListings.listings",[])
     return listings
\ No newline at end of file
@@ -1,9 +1,13 @@
-from curl_cffi import requests
-from bs4 import BeautifulSoup
-import json
+from pyairbnb.client import Client, get_client
+import pyairbnb.fastjson as fastjson
 import base64
 
-def get(api_key: str, cookies, host_id: str, language: str, proxy_url: str):
+def get(api_key: str, cookies, host_id: str, language: str, proxy_url: str, client: Client = None):
+    method, url, kwargs = prepare(api_key, cookies, host_id, language)
+    response = get_client(client, proxy_url).request(method, url, **kwargs)
+    return parse(response)
+
+def prepare(api_key: str, cookies, host_id: str, language: str):
     # Encode the host ID to match Airbnb's required format
     host_id = 'User:' + host_id
     user_id = base64.b64encode(host_id.encode()).decode('utf-8')
@@ -21,13 +25,13 @@ def get(api_key: str, cookies, host_id: str, language: str, proxy_url: str):
         'operationName': 'GetUserProfile',
         'locale': language,
         'currency': 'USD',
-        'variables': json.dumps({
+        'variables': fastjson.dumps({
             "userId": user_id,
             "isPassportStampsEnabled": True,
             "mockIdentifier": None,
             "fetchCombinedSportsAndInterests": True
         }),
-        'extensions': json.dumps({
+        'extensions': fastjson.dumps({
             "persistedQuery": {
                 "version": 1,
                 "sha256Hash": "a56d8909f271740ccfef23dd6c34d098f194f4a6e7157f244814c5610b8ad76a"
@@ -35,22 +39,17 @@ def get(api_key: str, cookies, host_id: str, language: str, proxy_url: str):
         })
     }
 
-    # Set up proxy if available
-    proxies = {"http": proxy_url, "https": proxy_url} if proxy_url else {}
-
-    # Make the GET request
-    response = requests.get(
-        'https://www.airbnb.com/api/v3/GetUserProfile/a56d8909f271740ccfef23dd6c34d098f194f4a6e7157f244814c5610b8ad76a',
-        params=params,
-        headers=headers,
-        cookies=cookies,
-        proxies=proxies
-    )
+    return "GET", 'https://www.airbnb.com/api/v3/GetUserProfile/a56d8909f271740ccfef23dd6c34d098f194f4a6e7157f244814c5610b8ad76a', {
+        "params": params,
+        "headers": headers,
+        "cookies": cookies,
+    }
 
+def parse(response):
     # Raise an exception if the request failed
     response.raise_for_status()
     
     # Parse the response JSON
-    data = response.json()
+    data = fastjson.loads(response.content)
     
     return data
@@ -0,0 +1,201 @@
+import gzip
+import io
+import time
+import pyairbnb.fastjson as fastjson
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# File extensions of the formats handled by this module
+extensions = (".jsonl", ".ndjson", ".jsonl.gz", ".ndjson.gz", ".jsonl.zst", ".ndjson.zst")
+
+
+def get_compression(path: str) -> str:
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return ""
+
+def is_jsonl(path: str) -> bool:
+    return path.endswith(extensions)
+
+def open_file(path: str, mode: str, compression: str = None):
+    """
+    Opens a file in binary mode ("rb", "wb" or "ab"), compressed with gzip or zstd. When
+    compression is None it is inferred from the extension (.gz, .zst).
+    """
+    if compression is None:
+        compression = get_compression(path)
+    if compression == "gzip":
+        return gzip.open(path, mode)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd compression requires the zstandard package")
+        if mode == "rb":
+            # appended runs are separate zstd frames
+            reader = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True, closefd=True)
+            return io.BufferedReader(reader)
+        return zstandard.open(path, mode, cctx=zstandard.ZstdCompressor(level=3))
+    if compression:
+        raise ValueError(f"unknown compression {compression}")
+    return open(path, mode)
+
+
+class JsonlWriter:
+    """
+    Appends records to a newline delimited JSON file, one record per line, so results are
+    written while a crawl runs instead of at the end and a crash only loses the records since
+    the last flush.
+
+    Args:
+        path (str): Output file, compressed with gzip when it ends with .gz and zstd with .zst.
+        compression (str): "gzip", "zstd" or "" to override the extension.
+        flush_every (int): Records written between two flushes.
+        flush_interval (float): Maximum seconds between two flushes.
+
+    Example:
+        with JsonlWriter("results/search.jsonl.gz") as writer:
+            for room in pyairbnb.iter_search(...):
+                writer.write(room)
+    """
+
+    def __init__(self, path: str, compression: str = None, flush_every: int = 100, flush_interval: float = 5.0):
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.file = open_file(path, "ab", compression)
+        self.count = 0
+        self.pending = 0
+        self.flushed_at = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, record):
+        self.file.write(fastjson.dumps_bytes(record) + b"\n")
+        self.count += 1
+        self.pending += 1
+        if self.pending >= self.flush_every or time.monotonic() - self.flushed_at >= self.flush_interval:
+            self.flush()
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        # gzip and zstd flushes end the current compressed block, so the data written so far
+        # can be read back even if the file is never closed
+        self.file.flush()
+        self.pending = 0
+        self.flushed_at = time.monotonic()
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+def read(path: str, compression: str = None):
+    """
+    Lazily reads the records of a newline delimited JSON file written by JsonlWriter, one
+    line at a time. A last line cut by a crash, without its newline, is ignored.
+
+    Yields:
+        The decoded records.
+    """
+    with open_file(path, "rb", compression) as f:
+        try:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield fastjson.loads(line)
+                except fastjson.JSONDecodeError:
+                    if line.endswith(b"\n"):
+                        raise
+                    return
+        except EOFError:
+            # compressed stream not closed by the writer, the records before it were read
+            return
+
+
+def read_array(path: str, compression: str = None, chunk_size: int = 1 << 20):
+    """
+    Lazily reads the items of a file holding a single JSON array, like the files written
+    with json.dump, without loading the whole file: it is decoded chunk by chunk and memory
+    stays around chunk_size plus the size of one item.
+
+    Yields:
+        The decoded items of the array.
+    """
+    with open_file(path, "rb", compression) as raw:
+        f = io.TextIOWrapper(raw, encoding="utf-8")
+        buffer = ""
+        position = 0
+        eof = False
+
+        def fill(size):
+            nonlocal buffer, position, eof
+            chunk = f.read(size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            return not eof
+
+        def next_char():
+            # first character after the whitespace, "" at the end of the file
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position] in " \t\r\n":
+                    position += 1
+                if position < len(buffer) or not fill(chunk_size):
+                    return buffer[position:position + 1]
+
+        if next_char() != "[":
+            raise ValueError(f"{path} does not contain a JSON array")
+        position += 1
+        separated = True
+        comma = False
+        while True:
+            char = next_char()
+            if char == "]":
+                if comma:
+                    raise fastjson.JSONDecodeError("Expecting value", buffer, position)
+                position += 1
+                # like json.loads, only whitespace may follow the array
+                if next_char():
+                    raise fastjson.JSONDecodeError("Extra data", buffer, position)
+                return
+            if not separated:
+                if char != ",":
+                    raise fastjson.JSONDecodeError("Expecting ',' delimiter", buffer, position)
+                position += 1
+                separated = True
+                comma = True
+                continue
+            try:
+                item, end = fastjson.raw_decode(buffer, position)
+            except fastjson.JSONDecodeError:
+                if eof:
+                    raise
+                # the item continues in the next chunk, the read size doubles for items
+                # larger than a chunk
+                fill(max(chunk_size, len(buffer)))
+                continue
+            following = end
+            while following < len(buffer) and buffer[following] in " \t\r\n":
+                following += 1
+            if not eof and (following == len(buffer) or buffer[following] not in ",]"):
+                # the item is only complete once the next delimiter is read, a number cut
+                # at the end of the chunk ("2." or "1e") decodes as a shorter number
+                fill(chunk_size)
+                continue
+            yield item
+            position = end
+            separated = False
+            comma = False
@@ -0,0 +1,260 @@
+import os
+import uuid
+from datetime import date
+import pyairbnb.fastjson as fastjson
+import pyairbnb.utils as utils
+from pyairbnb.columns import SearchColumns
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+    ds = None
+
+# Datasets are written as hive style directories: <base_dir>/crawl_date=YYYY-MM-DD/market=<market>/part-*.parquet
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet export requires the pyarrow package")
+
+def search_schema():
+    """
+    Schema of exported search results, one row per listing, built from the fields of
+    standardize.from_search. Missing prices and fees are null.
+    """
+    require_pyarrow()
+    return pa.schema([
+        ("room_id", pa.int64()),
+        ("category", pa.string()),
+        ("kind", pa.string()),
+        ("name", pa.string()),
+        ("title", pa.string()),
+        ("type", pa.string()),
+        ("latitude", pa.float64()),
+        ("longitude", pa.float64()),
+        ("price_qualifier", pa.string()),
+        ("price_currency_symbol", pa.string()),
+        ("price_amount", pa.float64()),
+        ("price_discount", pa.float64()),
+        ("price_total", pa.float64()),
+        ("price_total_currency_symbol", pa.string()),
+        ("cleaning_fee", pa.float64()),
+        ("airbnb_fee", pa.float64()),
+        ("long_stay_discount", pa.float64()),
+        ("rating", pa.float64()),
+        ("review_count", pa.int64()),
+        ("badges", pa.list_(pa.string())),
+        ("image_urls", pa.list_(pa.string())),
+        ("break_down", pa.list_(pa.struct([
+            ("description", pa.string()),
+            ("amount", pa.float64()),
+            ("currency", pa.string()),
+        ]))),
+    ])
+
+def details_schema():
+    """
+    Schema of exported get_details results, one row per listing. The scalar fields are
+    columns and the full result is kept as JSON in `data`.
+    """
+    require_pyarrow()
+    return pa.schema([
+        ("room_id", pa.int64()),
+        ("title", pa.string()),
+        ("room_type", pa.string()),
+        ("home_tier", pa.string()),
+        ("person_capacity", pa.int64()),
+        ("is_super_host", pa.bool_()),
+        ("is_guest_favorite", pa.bool_()),
+        ("latitude", pa.float64()),
+        ("longitude", pa.float64()),
+        ("rating_accuracy", pa.float64()),
+        ("rating_checking", pa.float64()),
+        ("rating_cleanliness", pa.float64()),
+        ("rating_communication", pa.float64()),
+        ("rating_location", pa.float64()),
+        ("rating_value", pa.float64()),
+        ("rating_guest_satisfaction", pa.float64()),
+        ("review_count", pa.int64()),
+        ("host_id", pa.string()),
+        ("host_name", pa.string()),
+        ("amenities", pa.list_(pa.string())),
+        ("image_urls", pa.list_(pa.string())),
+        ("language", pa.string()),
+        ("data", pa.string()),
+    ])
+
+def number(value, convert=float):
+    if value is None or value == "" or value != value:
+        return None
+    return convert(value)
+
+def rating_value(rating: dict):
+    # from_search writes 0 for listings without a rating yet, like parse_rating they have none
+    if not number(rating.get("reviewCount"), int):
+        return None
+    return number(rating.get("value"))
+
+def search_row(room: dict) -> dict:
+    unit = room["price"]["unit"]
+    total = room["price"]["total"]
+    return {
+        "room_id": room["room_id"],
+        "category": room["category"],
+        "kind": room["kind"],
+        "name": room["name"],
+        "title": room["title"],
+        "type": room["type"],
+        "latitude": number(room["coordinates"]["latitude"]),
+        "longitude": number(room["coordinates"]["longitud"]),
+        "price_qualifier": unit.get("qualifier"),
+        "price_currency_symbol": unit.get("curency_symbol"),
+        "price_amount": number(unit.get("amount")),
+        "price_discount": number(unit.get("discount")),
+        "price_total": number(total.get("amount")),
+        "price_total_currency_symbol": total.get("currency_symbol"),
+        "cleaning_fee": number(room["fee"]["cleaning"].get("amount")),
+        "airbnb_fee": number(room["fee"]["airbnb"].get("amount")),
+        "long_stay_discount": number(room["long_stay_discount"].get("amount")),
+        "rating": rating_value(room["rating"]),
+        "review_count": number(room["rating"]["reviewCount"], int),
+        "badges": room["badges"],
+        "image_urls": [image["url"] for image in room["images"]],
+        "break_down": room["price"]["break_down"],
+    }
+
+def details_row(room_id, data: dict) -> dict:
+    rating = data.get("rating", {})
+    return {
+        "room_id": int(room_id),
+        "title": data.get("title"),
+        "room_type": data.get("room_type"),
+        "home_tier": number(data.get("home_tier"), str),
+        "person_capacity": number(data.get("person_capacity"), int),
+        "is_super_host": data.get("is_super_host") if isinstance(data.get("is_super_host"), bool) else None,
+        "is_guest_favorite": data.get("is_guest_favorite"),
+        "latitude": number(utils.get_nested_value(data, "coordinates.latitude")),
+        "longitude": number(utils.get_nested_value(data, "coordinates.longitude")),
+        "rating_accuracy": number(rating.get("accuracy")),
+        "rating_checking": number(rating.get("checking")),
+        "rating_cleanliness": number(rating.get("cleanliness")),
+        "rating_communication": number(rating.get("communication")),
+        "rating_location": number(rating.get("location")),
+        "rating_value": number(rating.get("value")),
+        "rating_guest_satisfaction": number(rating.get("guest_satisfaction")),
+        "review_count": number(rating.get("review_count"), int),
+        "host_id": str(utils.get_nested_value(data, "host.id", "")),
+        "host_name": utils.get_nested_value(data, "host.name", ""),
+        "amenities": [amenity["title"] for group in data.get("amenities", []) for amenity in group["values"] if amenity.get("available")],
+        "image_urls": [image["url"] for image in data.get("images", [])],
+        "language": data.get("language"),
+        "data": fastjson.dumps(data),
+    }
+
+def search_table(rooms):
+    """
+    Converts search results, a list of standardize.from_search dicts or a SearchColumns, to
+    a pyarrow Table with search_schema.
+    """
+    require_pyarrow()
+    schema = search_schema()
+    if isinstance(rooms, SearchColumns):
+        return columns_table(rooms, schema)
+    return pa.Table.from_pylist([search_row(room) for room in rooms], schema=schema)
+
+def columns_table(columns: SearchColumns, schema):
+    c = columns.columns
+    arrays = []
+    for field in schema:
+        if field.name in ("badges", "image_urls", "break_down"):
+            continue
+        # from_pandas turns the NaN of missing values into nulls
+        arrays.append(pa.array(c[field.name], type=field.type, from_pandas=True))
+    list_offsets = {child: pa.array(offsets, type=pa.int32()) for child, offsets in columns.offsets.items()}
+    arrays.append(pa.ListArray.from_arrays(list_offsets["badges"], pa.array(c["badges"], type=pa.string())))
+    arrays.append(pa.ListArray.from_arrays(list_offsets["images"], pa.array(c["image_url"], type=pa.string())))
+    break_down = pa.StructArray.from_arrays([
+        pa.array(c["break_down_description"], type=pa.string()),
+        pa.array(c["break_down_amount"], type=pa.float64()),
+        pa.array(c["break_down_currency"], type=pa.string()),
+    ], names=["description", "amount", "currency"])
+    arrays.append(pa.ListArray.from_arrays(list_offsets["break_down"], break_down))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def details_table(details):
+    """
+    Converts get_details results, given as (room_id, data) pairs like the ones yielded by
+    get_details_many, to a pyarrow Table with details_schema.
+    """
+    require_pyarrow()
+    return pa.Table.from_pylist([details_row(room_id, data) for room_id, data in details], schema=details_schema())
+
+def write_partition(table, base_dir: str, market: str, crawl_date: str = None) -> str:
+    """
+    Writes a table as Parquet into the crawl_date/market partition of a dataset. Each call
+    adds new files, so several crawls of the same day and market are kept side by side.
+
+    Args:
+        table (pyarrow.Table): Rows to write.
+        base_dir (str): Root directory of the dataset.
+        market (str): Market of the crawl, for example the searched city.
+        crawl_date (str): Date of the crawl as YYYY-MM-DD, today when empty.
+
+    Returns:
+        str: Directory of the partition, as written by pyarrow: partition values are URL
+        encoded, so the market "New York" is in market=New%20York. None when the table is
+        empty, no file is written.
+    """
+    require_pyarrow()
+    crawl_date = crawl_date or date.today().isoformat()
+    table = table.append_column("crawl_date", pa.array([crawl_date] * table.num_rows, type=pa.string()))
+    table = table.append_column("market", pa.array([market] * table.num_rows, type=pa.string()))
+    written = []
+    ds.write_dataset(
+        table, base_dir, format="parquet",
+        partitioning=partitioning(), basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore", file_visitor=lambda written_file: written.append(written_file.path),
+    )
+    if not written:
+        # an empty table writes no file
+        return None
+    return os.path.dirname(written[0])
+
+def export_search(rooms, base_dir: str, market: str, crawl_date: str = None) -> str:
+    """
+    Exports search results, see search_table and write_partition.
+    """
+    return write_partition(search_table(rooms), base_dir, market, crawl_date)
+
+def export_details(details, base_dir: str, market: str, crawl_date: str = None) -> str:
+    """
+    Exports get_details results, see details_table and write_partition.
+    """
+    return write_partition(details_table(details), base_dir, market, crawl_date)
+
+def partitioning():
+    return ds.partitioning(pa.schema([("crawl_date", pa.string()), ("market", pa.string())]), flavor="hive")
+
+def read(base_dir: str, market: str = None, start_date: str = None, end_date: str = None, columns: list = None):
+    """
+    Reads an exported dataset. Only the partitions matching the market and the crawl date
+    range (inclusive, YYYY-MM-DD) are opened.
+
+    Returns:
+        pyarrow.Table: The matching rows.
+    """
+    require_pyarrow()
+    dataset = ds.dataset(base_dir, format="parquet", partitioning=partitioning())
+    conditions = []
+    if market is not None:
+        conditions.append(ds.field("market") == market)
+    if start_date is not None:
+        conditions.append(ds.field("crawl_date") >= start_date)
+    if end_date is not None:
+        conditions.append(ds.field("crawl_date") <= end_date)
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return dataset.to_table(columns=columns, filter=expression)
@@ -1,11 +1,12 @@
 import re
-import json
+import pyairbnb.fastjson as fastjson
 from bs4 import BeautifulSoup
 import pyairbnb.standardize as standardize
 import pyairbnb.utils as utils
 
 regxApiKey = re.compile(r'"key":".+?"')
 regexLanguage = re.compile(r'"language":".+?"')
+regexScriptEnd = re.compile(r'</script', re.IGNORECASE)
 
 
 def parse_body_details_wrapper(body:str):
@@ -20,8 +21,9 @@ def parse_body_details_wrapper(body:str):
     return data_formatted, price_dependency_input
 
 def parse_body_details(body:str):
-    soup = BeautifulSoup(body, 'html.parser')
-    data_deferred_state = soup.select("#data-deferred-state-0")[0].getText()
+    data_deferred_state = find_deferred_state(body)
+    if data_deferred_state is None:
+        data_deferred_state = find_deferred_state_soup(body)
     html_data = utils.remove_space(data_deferred_state)
     language = regexLanguage.search(body).group()
     language = language.replace('"language":"', "")
@@ -29,6 +31,30 @@ def parse_body_details(body:str):
     api_key = regxApiKey.search(body).group()
     api_key = api_key.replace('"key":"', "")
     api_key = api_key.replace('"', "")
-    data = json.loads(html_data)
+    data = fastjson.loads(html_data)
     details_data = data["niobeMinimalClientData"][0][1]
     return details_data, language, api_key
+
+def find_deferred_state(body:str):
+    """
+    Returns the text of the #data-deferred-state-0 script by searching the raw page,
+    without building the whole DOM. Returns None when the tag is not found where expected,
+    so the caller can fall back to BeautifulSoup.
+    """
+    id_index = body.find('id="data-deferred-state-0"')
+    if id_index == -1:
+        return None
+    tag_start = body.rfind("<", 0, id_index)
+    if tag_start == -1 or not body.startswith("<script", tag_start):
+        return None
+    content_start = body.find(">", id_index)
+    if content_start == -1:
+        return None
+    content_end = regexScriptEnd.search(body, content_start + 1)
+    if content_end is None:
+        return None
+    return body[content_start + 1:content_end.start()]
+
+def find_deferred_state_soup(body:str):
+    soup = BeautifulSoup(body, 'html.parser')
+    return soup.select("#data-deferred-state-0")[0].getText()
@@ -1,10 +1,15 @@
-import json
-from curl_cffi import requests
+import pyairbnb.fastjson as fastjson
+from pyairbnb.client import Client, get_client
 import pyairbnb.utils as utils
 from urllib.parse import urlencode
 ep = "https://www.airbnb.com/api/v3/StaysPdpSections/80c7889b4b0027d99ffea830f6c0d4911a6e863a957cbe1044823f0fc746bf1f"
 
-def get(api_key: str, cookies: list, impresion_id: str, product_id: str, checkIn: str, checkOut: str, adults: int, currency: str, language: str, proxy_url: str = None) -> (str):
+def get(api_key: str, cookies: list, impresion_id: str, product_id: str, checkIn: str, checkOut: str, adults: int, currency: str, language: str, proxy_url: str = None, client: Client = None) -> (str):
+        method, url, kwargs = prepare(api_key, cookies, impresion_id, product_id, checkIn, checkOut, adults, currency, language)
+        response = get_client(client, proxy_url).request(method, url, **kwargs)
+        return parse(response)
+
+def prepare(api_key: str, cookies: list, impresion_id: str, product_id: str, checkIn: str, checkOut: str, adults: int, currency: str, language: str):
         headers = {
             "Accept": "application/json",
             "Content-Type": "application/json",
@@ -17,7 +22,7 @@ def get(api_key: str, cookies: list, impresion_id: str, product_id: str, checkIn
                 "sha256Hash": "80c7889b4b0027d99ffea830f6c0d4911a6e863a957cbe1044823f0fc746bf1f",
             },
         }
-        dataRawExtension = json.dumps(entension)
+        dataRawExtension = fastjson.dumps(entension)
         variablesData={
             "id": product_id,
             "pdpSectionsRequest": {
@@ -59,7 +64,7 @@ def get(api_key: str, cookies: list, impresion_id: str, product_id: str, checkIn
                 "p3ImpressionId": impresion_id,
             },
         }
-        dataRawVariables = json.dumps(variablesData)
+        dataRawVariables = fastjson.dumps(variablesData)
         query = {
             "operationName": "StaysPdpSections",
             "locale": language,
@@ -68,18 +73,12 @@ def get(api_key: str, cookies: list, impresion_id: str, product_id: str, checkIn
             "extensions": dataRawExtension,
         }
         url = f"{ep}?{urlencode(query)}"
-        
-        session = requests.Session()
-        proxies = {}
-        if proxy_url:
-            proxies = {"http": proxy_url, "https": proxy_url}
-
-        session.cookies.update(cookies)
+        return "GET", url, {"headers": headers, "cookies": cookies}
 
-        response = session.get(url, headers=headers, proxies=proxies)
+def parse(response):
         response.raise_for_status()
 
-        data = response.json()
+        data = fastjson.loads(response.content)
 
         sections = utils.get_nested_value(data,"data.presentation.stayProductDetailPage.sections.sections",{})
         priceGroups = utils.get_nested_value(data,"data.presentation.stayProductDetailPage.sections.metadata.bookingPrefetchData.barPrice.explanationData.priceGroups",[])
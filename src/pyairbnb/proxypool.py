@@ -0,0 +1,112 @@
+import threading
+import time
+
+
+class ProxyPool:
+    """
+    Spreads requests over several proxies and keeps track of how each one behaves.
+
+    Every proxy has a success rate and a latency, both exponentially weighted, and a number of
+    requests in flight. Requests go to the proxy with the best success rate / latency score,
+    divided by its load, so traffic is spread while bad proxies get less of it. A proxy that
+    fails `max_failures` times in a row is dropped for `cooldown` seconds, doubled every time
+    it is dropped again, up to `max_cooldown`.
+
+    Args:
+        proxy_urls (list): Proxy URLs, an empty string means a direct connection.
+        max_failures (int): Consecutive failures before a proxy is dropped.
+        cooldown (float): Seconds a proxy is dropped for the first time.
+        max_cooldown (float): Maximum seconds a proxy is dropped for.
+        smoothing (float): Weight of the last request in the success rate and latency averages.
+    """
+
+    def __init__(self, proxy_urls: list, max_failures: int = 3, cooldown: float = 30, max_cooldown: float = 600, smoothing: float = 0.2):
+        if len(proxy_urls) == 0:
+            raise ValueError("proxy_urls can't be empty")
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.smoothing = smoothing
+        self.proxies = {}
+        for proxy_url in proxy_urls:
+            self.proxies[proxy_url or ""] = {
+                "success_rate": 1.0,
+                "latency": 0.0,
+                "in_flight": 0,
+                "requests": 0,
+                "failures": 0,
+                "consecutive_failures": 0,
+                "dropped": 0,
+                "dropped_until": 0.0,
+            }
+        self.lock = threading.Lock()
+
+    @property
+    def proxy_urls(self) -> list:
+        return list(self.proxies.keys())
+
+    def score(self, proxy: dict, default_latency: float) -> float:
+        return proxy["success_rate"] / ((proxy["latency"] or default_latency) * (1 + proxy["in_flight"]))
+
+    def choose(self) -> str:
+        """
+        Returns the proxy the next request should use and counts the request as in flight.
+        When every proxy is dropped, the one that comes back first is used.
+        """
+        with self.lock:
+            now = time.monotonic()
+            available = [proxy_url for proxy_url, proxy in self.proxies.items() if proxy["dropped_until"] <= now]
+            if available:
+                # Proxies without a measured latency are assumed to be as fast as the fastest one
+                default_latency = min([proxy["latency"] for proxy in self.proxies.values() if proxy["latency"] > 0], default=1.0)
+                proxy_url = max(available, key=lambda proxy_url: (
+                    self.score(self.proxies[proxy_url], default_latency), -self.proxies[proxy_url]["requests"]
+                ))
+            else:
+                proxy_url = min(self.proxies, key=lambda proxy_url: self.proxies[proxy_url]["dropped_until"])
+            self.proxies[proxy_url]["in_flight"] += 1
+            return proxy_url
+
+    def release(self, proxy_url: str):
+        # the request was given up before being sent, it doesn't count for the health of the proxy
+        with self.lock:
+            self.proxies[proxy_url]["in_flight"] -= 1
+
+    def record(self, proxy_url: str, success: bool, latency: float):
+        with self.lock:
+            proxy = self.proxies[proxy_url]
+            proxy["in_flight"] -= 1
+            proxy["requests"] += 1
+            proxy["success_rate"] += self.smoothing * ((1.0 if success else 0.0) - proxy["success_rate"])
+            if success:
+                proxy["consecutive_failures"] = 0
+                if proxy["latency"] == 0:
+                    proxy["latency"] = latency
+                else:
+                    proxy["latency"] += self.smoothing * (latency - proxy["latency"])
+                return
+            proxy["failures"] += 1
+            proxy["consecutive_failures"] += 1
+            if proxy["consecutive_failures"] >= self.max_failures:
+                cooldown = min(self.max_cooldown, self.cooldown * 2 ** proxy["dropped"])
+                proxy["dropped"] += 1
+                proxy["dropped_until"] = time.monotonic() + cooldown
+                proxy["consecutive_failures"] = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            now = time.monotonic()
+            return {
+                proxy_url: {
+                    "success_rate": proxy["success_rate"],
+                    "latency": proxy["latency"],
+                    "requests": proxy["requests"],
+                    "failures": proxy["failures"],
+                    "available": proxy["dropped_until"] <= now,
+                }
+                for proxy_url, proxy in self.proxies.items()
+            }
+
+
+def is_healthy_response(status_code: int) -> bool:
+    return status_code != 0 and status_code not in (403, 429) and status_code < 500
@@ -0,0 +1,145 @@
+import threading
+import time
+from urllib.parse import urlparse
+
+blocked_status_codes = (429, 403)
+
+
+def endpoint_name(url: str) -> str:
+    """
+    Returns the name used to budget a request: the operation name for API calls
+    (StaysSearch, PdpAvailabilityCalendar, user_markets ...), "rooms" for room pages
+    and "homepage" for anything else.
+    """
+    parts = [part for part in urlparse(url).path.split("/") if part]
+    if len(parts) >= 3 and parts[0] == "api":
+        return parts[2]
+    if parts and parts[0] == "rooms":
+        return "rooms"
+    return "homepage"
+
+
+class TokenBucket:
+    """
+    Classic token bucket, `rate` tokens are added per second up to `burst`.
+    """
+
+    def __init__(self, rate: float, burst: float = 0):
+        self.rate = rate
+        self.burst = burst or max(rate, 1)
+        self.tokens = self.burst
+        self.updated_at = time.monotonic()
+
+    def wait_time(self, now: float) -> float:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+
+class RateLimiter:
+    """
+    Throttles every request made by a Client or an AsyncAirbnbClient.
+
+    Requests have to get a token from the global bucket, from the bucket of their endpoint
+    and from the bucket of their proxy, and a free slot under the current concurrency limit.
+    The concurrency limit follows AIMD: it grows by one every `limit` successful responses
+    and is multiplied by `decrease_factor` when airbnb answers 429/403 or a response is slower
+    than `target_latency`, at most once every `cooldown` seconds.
+
+    Args:
+        rate (float): Requests per second for all traffic, 0 for no limit.
+        burst (float): Size of the global bucket, defaults to `rate`.
+        endpoint_rates (dict): Requests per second per endpoint name, for example {"StaysSearch": 2}.
+        proxy_rate (float): Requests per second per proxy, 0 for no limit.
+        initial_concurrency (int): Concurrency limit to start with.
+        min_concurrency (int): Lowest concurrency limit.
+        max_concurrency (int): Highest concurrency limit.
+        decrease_factor (float): Factor applied to the concurrency limit on a blocked or slow response.
+        target_latency (float): Response time in seconds above which the limit is decreased, 0 to ignore latency.
+        cooldown (float): Minimum seconds between two decreases.
+    """
+
+    def __init__(self, rate: float = 0, burst: float = 0, endpoint_rates: dict = None, proxy_rate: float = 0,
+                 initial_concurrency: int = 32, min_concurrency: int = 1, max_concurrency: int = 512,
+                 decrease_factor: float = 0.5, target_latency: float = 0, cooldown: float = 1.0):
+        self.global_bucket = TokenBucket(rate, burst) if rate else None
+        self.endpoint_rates = endpoint_rates or {}
+        self.endpoint_buckets = {}
+        self.proxy_rate = proxy_rate
+        self.proxy_buckets = {}
+        self.limit = float(initial_concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+        self.target_latency = target_latency
+        self.cooldown = cooldown
+        self.decreased_at = 0.0
+        self.in_flight = 0
+        self.stats = {"requests": 0, "blocked": 0, "slow": 0, "decreases": 0}
+        self.lock = threading.Lock()
+
+    def buckets(self, endpoint: str, proxy_url: str) -> list:
+        buckets = []
+        if self.global_bucket is not None:
+            buckets.append(self.global_bucket)
+        if endpoint in self.endpoint_rates:
+            if endpoint not in self.endpoint_buckets:
+                self.endpoint_buckets[endpoint] = TokenBucket(self.endpoint_rates[endpoint])
+            buckets.append(self.endpoint_buckets[endpoint])
+        if self.proxy_rate:
+            if proxy_url not in self.proxy_buckets:
+                self.proxy_buckets[proxy_url] = TokenBucket(self.proxy_rate)
+            buckets.append(self.proxy_buckets[proxy_url])
+        return buckets
+
+    def try_acquire(self, endpoint: str, proxy_url: str = "") -> float:
+        """
+        Takes a slot and a token from every bucket and returns 0, or returns how many
+        seconds to wait before trying again without taking anything.
+        """
+        with self.lock:
+            if self.in_flight >= int(self.limit):
+                return 0.01
+            now = time.monotonic()
+            buckets = self.buckets(endpoint, proxy_url)
+            wait_time = max([bucket.wait_time(now) for bucket in buckets], default=0)
+            if wait_time > 0:
+                return wait_time
+            for bucket in buckets:
+                bucket.take()
+            self.in_flight += 1
+            self.stats["requests"] += 1
+            return 0
+
+    def acquire(self, endpoint: str, proxy_url: str = ""):
+        while True:
+            wait_time = self.try_acquire(endpoint, proxy_url)
+            if wait_time == 0:
+                return
+            time.sleep(wait_time)
+
+    def release(self, endpoint: str, proxy_url: str, status_code: int, latency: float):
+        with self.lock:
+            self.in_flight -= 1
+            blocked = status_code in blocked_status_codes
+            slow = self.target_latency > 0 and latency > self.target_latency
+            if blocked:
+                self.stats["blocked"] += 1
+            if slow:
+                self.stats["slow"] += 1
+            if blocked or slow:
+                now = time.monotonic()
+                if now - self.decreased_at >= self.cooldown:
+                    self.decreased_at = now
+                    self.limit = max(self.min_concurrency, self.limit * self.decrease_factor)
+                    self.stats["decreases"] += 1
+            elif status_code:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+
+
+shared_limiter = RateLimiter()
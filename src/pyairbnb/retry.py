@@ -0,0 +1,138 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from curl_cffi.requests.exceptions import RequestException
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"circuit open for {endpoint}, retry in {retry_in:.1f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class RetryPolicy:
+    """
+    Decides which requests are retried and how long to wait between attempts.
+
+    Timeouts, connection errors and the status codes in `retry_status_codes` are retried up to
+    `max_attempts` times in total with exponential backoff and full jitter. A Retry-After header
+    on the response takes precedence over the backoff.
+
+    Args:
+        max_attempts (int): Attempts per request, 1 disables retries.
+        base_delay (float): Backoff of the first retry in seconds.
+        max_delay (float): Maximum wait between two attempts in seconds.
+        retry_status_codes (tuple): Status codes considered transient.
+    """
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 1.0, max_delay: float = 60.0,
+                 retry_status_codes: tuple = (429, 500, 502, 503, 504)):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_status_codes = retry_status_codes
+
+    def is_transient(self, error: Exception) -> bool:
+        return isinstance(error, RequestException) and getattr(error, "response", None) is None
+
+    def should_retry(self, status_code: int) -> bool:
+        return status_code in self.retry_status_codes
+
+    def delay(self, attempt: int, response=None) -> float:
+        retry_after = get_retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to an endpoint that keeps failing.
+
+    After `failure_threshold` consecutive failed requests the circuit of the endpoint opens and
+    requests fail fast with CircuitOpenError for `reset_timeout` seconds. Then a single trial
+    request is let through: the circuit closes if it succeeds and opens again if it fails. A
+    trial that ends without being recorded, by another error or a cancellation, is released
+    with end_trial so that the next request becomes the trial.
+
+    Args:
+        failure_threshold (int): Consecutive failures that open the circuit.
+        reset_timeout (float): Seconds the circuit stays open.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.circuits = {}
+        self.lock = threading.Lock()
+
+    def check(self, endpoint: str):
+        """
+        Raises CircuitOpenError when the circuit of the endpoint is open. Returns a token when
+        the request is the trial of a half-open circuit, None otherwise.
+        """
+        with self.lock:
+            circuit = self.circuits.get(endpoint)
+            if circuit is None or circuit["opened_at"] is None:
+                return None
+            retry_in = circuit["opened_at"] + self.reset_timeout - time.monotonic()
+            if retry_in > 0 or circuit["trial"]:
+                raise CircuitOpenError(endpoint, max(retry_in, 0))
+            circuit["trial"] = object()
+            return circuit["trial"]
+
+    def end_trial(self, endpoint: str, trial):
+        # no-op when the trial was recorded or a later trial started
+        if trial is None:
+            return
+        with self.lock:
+            circuit = self.circuits.get(endpoint)
+            if circuit is not None and circuit["trial"] is trial:
+                circuit["trial"] = False
+
+    def record(self, endpoint: str, success: bool):
+        with self.lock:
+            circuit = self.circuits.setdefault(endpoint, {"failures": 0, "opened_at": None, "trial": False})
+            if success:
+                circuit["failures"] = 0
+                circuit["opened_at"] = None
+                circuit["trial"] = False
+                return
+            circuit["failures"] += 1
+            if circuit["trial"] or circuit["failures"] >= self.failure_threshold:
+                circuit["opened_at"] = time.monotonic()
+                circuit["trial"] = False
+
+    def state(self, endpoint: str) -> str:
+        with self.lock:
+            circuit = self.circuits.get(endpoint)
+            if circuit is None or circuit["opened_at"] is None:
+                return "closed"
+            if circuit["trial"] or time.monotonic() - circuit["opened_at"] >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+
+def get_retry_after(response):
+    if response is None:
+        return None
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+def is_failure(status_code: int) -> bool:
+    return status_code == 0 or status_code == 429 or status_code >= 500
+
+
+default_policy = RetryPolicy()
+shared_breaker = CircuitBreaker()
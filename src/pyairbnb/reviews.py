@@ -1,22 +1,32 @@
-from curl_cffi import requests
+from pyairbnb.client import Client, get_client
 import pyairbnb.utils as utils
 from urllib.parse import urlencode
-import json
+import pyairbnb.fastjson as fastjson
 
 ep="https://www.airbnb.com/api/v3/StaysPdpReviewsQuery/dec1c8061483e78373602047450322fd474e79ba9afa8d3dbbc27f504030f91d/"
 
-def get(api_key: str = "", product_id: str= "", currency: str = "USD", language: str = "en", proxy_url: str = None) -> str:
+def get(api_key: str = "", product_id: str= "", currency: str = "USD", language: str = "en", proxy_url: str = None, client: Client = None) -> str:
     offset = 0
     all_reviews = []
     while True:
-        reviews = get_from_offset(api_key, offset, product_id, currency, language, proxy_url)
+        try:
+            reviews = get_from_offset(api_key, offset, product_id, currency, language, proxy_url, client)
+        except Exception as e:
+            if not all_reviews:
+                raise
+            raise utils.PartialResultsError(e, all_reviews) from e
         offset=offset+50
         if len(reviews)==0:
             break
         all_reviews.extend(reviews)
     return all_reviews    
 
-def get_from_offset(api_key: str, offset: int, product_id: str, currency: str = "USD", language: str = "en", proxy_url: str = None) -> str:
+def get_from_offset(api_key: str, offset: int, product_id: str, currency: str = "USD", language: str = "en", proxy_url: str = None, client: Client = None) -> str:
+    method, url, kwargs = prepare_from_offset(api_key, offset, product_id, currency, language)
+    response = get_client(client, proxy_url).request(method, url, **kwargs)
+    return parse_from_offset(response)
+
+def prepare_from_offset(api_key: str, offset: int, product_id: str, currency: str = "USD", language: str = "en"):
     headers = {
             "Accept": "application/json",
             "Content-Type": "application/json",
@@ -46,8 +56,8 @@ def get_from_offset(api_key: str, offset: int, product_id: str, currency: str =
             "sha256Hash": "dec1c8061483e78373602047450322fd474e79ba9afa8d3dbbc27f504030f91d",
         },
     }
-    dataRawExtension = json.dumps(entension)
-    dataRawVariables = json.dumps(variablesData)
+    dataRawExtension = fastjson.dumps(entension)
+    dataRawVariables = fastjson.dumps(variablesData)
     query = {
         "operationName": "StaysPdpReviewsQuery",
         "locale": language,
@@ -56,11 +66,10 @@ def get_from_offset(api_key: str, offset: int, product_id: str, currency: str =
         "extensions": dataRawExtension,
     }
     url = f"{ep}?{urlencode(query)}"
-    proxies = {}
-    if proxy_url:
-        proxies = {"http": proxy_url, "https": proxy_url}
-    response = requests.get(url, headers=headers, proxies=proxies, timeout=60)
+    return "GET", url, {"headers": headers, "timeout": 60}
+
+def parse_from_offset(response):
     response.raise_for_status() 
-    data = response.json()
+    data = fastjson.loads(response.content)
     reviews = utils.get_nested_value(data,"data.presentation.stayProductDetailPage.reviews.reviews",{})
     return reviews
\ No newline at end of file
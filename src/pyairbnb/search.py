@@ -1,8 +1,8 @@
 from datetime import datetime
 from urllib.parse import urlencode
 import pyairbnb.utils as utils
-from curl_cffi import requests
-import json
+from pyairbnb.client import Client, get_client
+import pyairbnb.fastjson as fastjson
 
 ep_autocomplete = "https://www.airbnb.com/api/v2/autocompletes-personalized"
 ep_market = "https://www.airbnb.com/api/v2/user_markets"
@@ -20,7 +20,6 @@ headers_global = {
     "Accept-Language": "en",
     "Cache-Control": "no-cache",
     "content-type": "application/json",
-    "Connection": "close",
     "Pragma": "no-cache",
     "Sec-Ch-Ua": '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
     "Sec-Ch-Ua-Mobile": "?0",
@@ -33,7 +32,12 @@ headers_global = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 }
 
-def get(api_key:str, cursor:str, check_in:str, check_out:str, ne_lat:float, ne_long:float, sw_lat:float, sw_long:float, zoom_value:int, currency:str, place_type: str, price_min: int, price_max: int, amenities: list, language: str, proxy_url:str):
+def get(api_key:str, cursor:str, check_in:str, check_out:str, ne_lat:float, ne_long:float, sw_lat:float, sw_long:float, zoom_value:int, currency:str, place_type: str, price_min: int, price_max: int, amenities: list, language: str, proxy_url:str, client: Client = None):
+    method, url, kwargs = prepare(api_key, cursor, check_in, check_out, ne_lat, ne_long, sw_lat, sw_long, zoom_value, currency, place_type, price_min, price_max, amenities, language)
+    response = get_client(client, proxy_url).request(method, url, **kwargs)
+    return parse(response)
+
+def prepare(api_key:str, cursor:str, check_in:str, check_out:str, ne_lat:float, ne_long:float, sw_lat:float, sw_long:float, zoom_value:int, currency:str, place_type: str, price_min: int, price_max: int, amenities: list, language: str):
     base_url = "https://www.airbnb.com/api/v3/StaysSearch/d4d9503616dc72ab220ed8dcf17f166816dccb2593e7b4625c91c3fce3a3b3d6"
     query_params = {
         "operationName": "StaysSearch",
@@ -130,17 +134,20 @@ def get(api_key:str, cursor:str, check_in:str, check_out:str, ne_lat:float, ne_l
     }
     headers_copy = headers_global.copy()
     headers_copy["X-Airbnb-Api-Key"] = api_key
-    proxies = {}
-    if proxy_url:
-        proxies = {"http": proxy_url, "https": proxy_url}
-    response = requests.post(url_parsed, json = inputData, headers=headers_copy, proxies=proxies,  impersonate="chrome124")
-    if response.status_code != 200:
-        raise Exception("Not corret status code: ", response.status_code, " response body: ",response.text)
-    data = response.json()
+    return "POST", url_parsed, {"data": fastjson.dumps_bytes(inputData), "headers": headers_copy, "impersonate": "chrome124"}
+
+def parse(response):
+    utils.check_status(response)
+    data = fastjson.loads(response.content)
     to_return=utils.get_nested_value(data,"data.presentation.staysSearch.results",{})
     return to_return
 
-def get_markets(currency: str, locale: str, api_key: str, proxy_url: str):
+def get_markets(currency: str, locale: str, api_key: str, proxy_url: str, client: Client = None):
+    method, url, kwargs = prepare_markets(currency, locale, api_key)
+    response = get_client(client, proxy_url).request(method, url, **kwargs)
+    return parse_markets(response)
+
+def prepare_markets(currency: str, locale: str, api_key: str):
     query_params = {
         "locale": locale,
         "currency": currency,
@@ -149,16 +156,19 @@ def get_markets(currency: str, locale: str, api_key: str, proxy_url: str):
     url_parsed = f"{ep_market}?{urlencode(query_params)}"
     headers_copy = headers_global.copy()
     headers_copy["X-Airbnb-Api-Key"] = api_key
-    proxies = {}
-    if proxy_url:
-        proxies = {"http": proxy_url, "https": proxy_url}
-    response = requests.get(url_parsed, headers=headers_copy, proxies=proxies, impersonate="chrome124")
-    if response.status_code != 200:
-        raise Exception("Not corret status code: ", response.status_code, " response body: ",response.text)
-    data = response.json()
+    return "GET", url_parsed, {"headers": headers_copy, "impersonate": "chrome124"}
+
+def parse_markets(response):
+    utils.check_status(response)
+    data = fastjson.loads(response.content)
     return data
 
-def get_places_ids(country: str, location_name: str, currency: str, locale: str, config_token: str, api_key: str, proxy_url: str):
+def get_places_ids(country: str, location_name: str, currency: str, locale: str, config_token: str, api_key: str, proxy_url: str, client: Client = None):
+    method, url, kwargs = prepare_places_ids(country, location_name, currency, locale, config_token, api_key)
+    response = get_client(client, proxy_url).request(method, url, **kwargs)
+    return parse_places_ids(response)
+
+def prepare_places_ids(country: str, location_name: str, currency: str, locale: str, config_token: str, api_key: str):
     query_params = {
         "currency": currency,
         "country": country,
@@ -176,12 +186,10 @@ def get_places_ids(country: str, location_name: str, currency: str, locale: str,
     url_parsed = f"{ep_autocomplete}?{urlencode(query_params)}"
     headers_copy = headers_global.copy()
     headers_copy["X-Airbnb-Api-Key"] = api_key
-    proxies = {}
-    if proxy_url:
-        proxies = {"http": proxy_url, "https": proxy_url}
-    response = requests.get(url_parsed, headers=headers_copy, proxies=proxies, impersonate="chrome124")
-    if response.status_code != 200:
-        raise Exception("Not corret status code: ", response.status_code, " response body: ",response.text)
-    data = response.json()
+    return "GET", url_parsed, {"headers": headers_copy, "impersonate": "chrome124"}
+
+def parse_places_ids(response):
+    utils.check_status(response)
+    data = fastjson.loads(response.content)
     to_return=utils.get_nested_value(data,"autocomplete_terms", [])
     return to_return
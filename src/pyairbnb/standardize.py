@@ -1,23 +1,98 @@
 import re
+import math
 import pyairbnb.utils as utils
+from pyairbnb.columns import SearchColumns
 
 regex_number =  re.compile(r'\d+')
+
+Path = utils.NestedPath
+
+# search results
+type_name_path = Path("__typename", "")
+listing_path = Path("listing", {})
+display_price_path = Path("pricingQuote.structuredStayDisplayPrice", {})
+room_type_category_path = Path("roomTypeCategory", "")
+pdp_url_type_path = Path("pdpUrlType", "")
+name_path = Path("name", "")
+title_path = Path("title", "")
+listing_obj_type_path = Path("listingObjType", "")
+qualifier_path = Path("primaryLine.qualifier", "")
+latitude_path = Path("coordinate.latitude", 0)
+longitude_path = Path("coordinate.longitude", 0)
+badges_path = Path("formattedBadges", ())
+badge_type_path = Path("loggingContext.badgeType", "")
+avg_rating_path = Path("avgRatingLocalized", "")
+original_price_path = Path("primaryLine.originalPrice", "")
+price_path = Path("primaryLine.price", "")
+discounted_price_path = Path("primaryLine.discountedPrice", "")
+secondary_price_path = Path("secondaryLine.price", "")
+pictures_path = Path("contextualPictures", ())
+picture_path = Path("picture", "")
+price_details_path = Path("explanationData.priceDetails", ())
+items_path = Path("items", ())
+
+# break down items copied into their own column by from_search_columnar
+fee_columns = {
+    ("DISCOUNTED_EXPLANATION_LINE_ITEM", "Long stay discount"): "long_stay_discount",
+    ("DEFAULT_EXPLANATION_LINE_ITEM", "Cleaning fee"): "cleaning_fee",
+    ("DEFAULT_EXPLANATION_LINE_ITEM", "Airbnb service fee"): "airbnb_fee",
+}
+
+# details
+event_data_paths = {
+    "latitude":           Path("listingLat", 0),
+    "longitude":          Path("listingLng", 0),
+    "room_type":          Path("roomType", ""),
+    "is_super_host":      Path("isSuperhost", ""),
+    "home_tier":          Path("homeTier", ""),
+    "person_capacity":    Path("personCapacity", 0),
+    "accuracy":           Path("accuracyRating", 0),
+    "checking":           Path("checkinRating", 0),
+    "cleanliness":        Path("cleanlinessRating", 0),
+    "communication":      Path("communicationRating", 0),
+    "location":           Path("locationRating", 0),
+    "value":              Path("valueRating", 0),
+    "guest_satisfaction": Path("guestSatisfactionOverall", 0),
+    "review_count":       Path("visibleReviewCount", 0),
+}
+sections_path = Path("data.presentation.stayProductDetailPage.sections.sections", ())
+section_path = Path("section", {})
+sbui_data_path = Path("data.presentation.stayProductDetailPage.sections.sbuiData")
+sbui_sections_path = Path("sectionConfiguration.root.sections", ())
+section_data_type_path = Path("sectionData.__typename", "")
+section_data_host_id_path = Path("sectionData.hostAvatar.loggingEventData.eventData.pdpContext.hostId", "")
+section_data_title_path = Path("sectionData.title", "")
+overview_items_path = Path("sectionData.overviewItems", ())
+section_type_path = Path("section.__typename", "")
+host_user_id_path = Path("section.hostAvatar.userID", "")
+section_title_path = Path("section.title", "")
+section_subtitle_path = Path("section.subtitle", "")
+host_description_path = Path("section.hostProfileDescription.htmlText", "")
+additional_hosts_path = Path("section.additionalHosts", ())
+media_items_path = Path("section.mediaItems", ())
+house_rules_sections_path = Path("section.houseRulesSections", ())
+html_text_path = Path("html.htmlText", "")
+location_details_path = Path("section.seeAllLocationDetails", ())
+content_html_text_path = Path("content.htmlText")
+highlights_path = Path("section.highlights", ())
+html_description_path = Path("section.htmlDescription.htmlText", "")
+amenities_groups_path = Path("section.seeAllAmenitiesGroups", ())
             
 def from_search(results):
     datas = []
     for result in results:
-        type_name = utils.get_nested_value(result,"__typename","")
+        type_name = type_name_path(result)
         if type_name!="StaySearchResult":
             continue
-        lt = utils.get_nested_value(result,"listing",{})
-        pr = utils.get_nested_value(result,"pricingQuote.structuredStayDisplayPrice",{})
+        lt = listing_path(result)
+        pr = display_price_path(result)
         data = {
             "room_id":  int(lt["id"]),
-            "category": utils.get_nested_value(lt,"roomTypeCategory",""),
-            "kind":     utils.get_nested_value(lt,"pdpUrlType",""),
-            "name":     utils.get_nested_value(lt,"name",""),
-            "title":    utils.get_nested_value(lt,"title",""),
-            "type":     utils.get_nested_value(lt,"listingObjType",""),
+            "category": room_type_category_path(lt),
+            "kind":     pdp_url_type_path(lt),
+            "name":     name_path(lt),
+            "title":    title_path(lt),
+            "type":     listing_obj_type_path(lt),
             "long_stay_discount":{},
             "fee":{
                 "airbnb":{},
@@ -25,7 +100,7 @@ def from_search(results):
             },
             "price": {
                 "unit":{
-                    "qualifier":  utils.get_nested_value(pr,"primaryLine.qualifier","") 
+                    "qualifier":  qualifier_path(pr) 
                 },
                 "total":{},
                 "break_down":[],
@@ -37,59 +112,44 @@ def from_search(results):
             "images": [],
             "badges": [],
             "coordinates":{
-                "latitude": utils.get_nested_value(lt,"coordinate.latitude",0),
-                "longitud": utils.get_nested_value(lt,"coordinate.longitude",0),
+                "latitude": latitude_path(lt),
+                "longitud": longitude_path(lt),
             },
         }
-        for badge in utils.get_nested_value(lt,"formattedBadges",[]):
-            data["badges"].append(utils.get_nested_value(badge,"loggingContext.badgeType",""))
-
-        avgRatingLocalized = utils.get_nested_value(lt,"avgRatingLocalized","")
-        splited = avgRatingLocalized.split(" ")
-        if len(splited)==2:
-            splited[0] = splited[0].replace(",",".")
-            rating = float(splited[0])
-            data["rating"]["value"]=rating
-            reviewCount = regex_number.search(splited[1]).group()
-            data["rating"]["reviewCount"]=reviewCount
-        price_to_use = utils.get_nested_value(pr,"primaryLine.originalPrice","")
+        for badge in badges_path(lt):
+            data["badges"].append(badge_type_path(badge))
+
+        rating = parse_rating(avg_rating_path(lt))
+        if rating is not None:
+            data["rating"]["value"], data["rating"]["reviewCount"] = rating
+        price_to_use = original_price_path(pr)
         if price_to_use=="":
-              price_to_use = utils.get_nested_value(pr,"primaryLine.price","")
+              price_to_use = price_path(pr)
 
         if price_to_use!="": 
             amount, currency = utils.parse_price_symbol(price_to_use)
             data["price"]["unit"]["curency_symbol"]=currency
             data["price"]["unit"]["amount"]=amount   
 
-        discountedPrice=utils.get_nested_value(pr,"primaryLine.discountedPrice","")
+        discountedPrice=discounted_price_path(pr)
         if discountedPrice!="":
             amount, _ = utils.parse_price_symbol(discountedPrice)
             data["price"]["unit"]["discount"]=amount
 
-        splited = utils.get_nested_value(pr,"secondaryLine.price","").split(" ")
-        price_to_use=""
-        match len(splited):
-            case 1:
-                if len(splited[0])!=0:
-                    print("price error: ",splited )
-            case 2:
-                price_to_use=splited[0]
-            case 3:
-                splited = splited[:len(splited)-1]
-                price_to_use = "".join(splited)
-            case _:
-                continue
+        price_to_use = parse_total_price(pr)
+        if price_to_use is None:
+            continue
 
         amount, currency = utils.parse_price_symbol(price_to_use)
         data["price"]["total"]["currency_symbol"]=currency
         data["price"]["total"]["amount"]=amount
-        for image_data in utils.get_nested_value(lt,"contextualPictures",[]):
-            img={"url": utils.get_nested_value(image_data,"picture","")}
+        for image_data in pictures_path(lt):
+            img={"url": picture_path(image_data)}
             data["images"].append(img)   
-        for price_detail in utils.get_nested_value(pr,"explanationData.priceDetails",[]):
+        for price_detail in price_details_path(pr):
             if "items" not in price_detail:
                 continue
-            for item in utils.get_nested_value(price_detail,"items",[]): 
+            for item in items_path(price_detail): 
                 amount, currency = utils.parse_price_symbol(item["priceString"])
                 data["price"]["break_down"].append({"description":item["description"],"amount":amount,"currency":currency})
                 match item["displayComponentType"]:
@@ -109,28 +169,129 @@ def from_search(results):
         datas.append(data)
 
     return datas
+
+def parse_rating(avgRatingLocalized: str):
+    """
+    Returns the rating and the review count of a localized rating like "4,92 (439)",
+    None when the listing has no rating yet.
+    """
+    splited = avgRatingLocalized.split(" ")
+    if len(splited)!=2:
+        return None
+    rating = float(splited[0].replace(",","."))
+    reviewCount = regex_number.search(splited[1]).group()
+    return rating, reviewCount
+
+def parse_total_price(pr):
+    """
+    Returns the total price string of a search result, None when it can't be read and the
+    listing has to be skipped.
+    """
+    splited = secondary_price_path(pr).split(" ")
+    price_to_use=""
+    match len(splited):
+        case 1:
+            if len(splited[0])!=0:
+                print("price error: ",splited )
+        case 2:
+            price_to_use=splited[0]
+        case 3:
+            splited = splited[:len(splited)-1]
+            price_to_use = "".join(splited)
+        case _:
+            return None
+    return price_to_use
+
+def from_search_columnar(results, columns: SearchColumns = None) -> SearchColumns:
+    """
+    Same as from_search but writes the listings into the typed columns of a SearchColumns
+    instead of building a dict per listing, so the results of several pages can be appended
+    to the same columns and handed to NumPy or Arrow without copying.
+
+    Args:
+        results (list): Raw searchResults of a search page.
+        columns (SearchColumns): Columns to append to, new ones when empty.
+
+    Returns:
+        SearchColumns: The columns with the listings appended.
+    """
+    if columns is None:
+        columns = SearchColumns()
+    c = columns.columns
+    for result in results:
+        if type_name_path(result)!="StaySearchResult":
+            continue
+        lt = listing_path(result)
+        pr = display_price_path(result)
+        total_price = parse_total_price(pr)
+        if total_price is None:
+            continue
+        c["room_id"].append(int(lt["id"]))
+        c["category"].append(room_type_category_path(lt))
+        c["kind"].append(pdp_url_type_path(lt))
+        c["name"].append(name_path(lt))
+        c["title"].append(title_path(lt))
+        c["type"].append(listing_obj_type_path(lt))
+        c["latitude"].append(latitude_path(lt))
+        c["longitude"].append(longitude_path(lt))
+        c["price_qualifier"].append(qualifier_path(pr))
+
+        rating = parse_rating(avg_rating_path(lt))
+        c["rating"].append(rating[0] if rating is not None else math.nan)
+        c["review_count"].append(int(rating[1]) if rating is not None else 0)
+
+        price_to_use = original_price_path(pr)
+        if price_to_use=="":
+            price_to_use = price_path(pr)
+        amount, currency = utils.parse_price_symbol(price_to_use) if price_to_use!="" else (math.nan, "")
+        c["price_amount"].append(amount)
+        c["price_currency_symbol"].append(currency)
+        discountedPrice = discounted_price_path(pr)
+        c["price_discount"].append(utils.parse_price_symbol(discountedPrice)[0] if discountedPrice!="" else math.nan)
+        amount, currency = utils.parse_price_symbol(total_price)
+        c["price_total"].append(amount)
+        c["price_total_currency_symbol"].append(currency)
+
+        for badge in badges_path(lt):
+            c["badges"].append(badge_type_path(badge))
+        for image_data in pictures_path(lt):
+            c["image_url"].append(picture_path(image_data))
+        fees = dict.fromkeys(fee_columns.values(), math.nan)
+        for price_detail in price_details_path(pr):
+            for item in items_path(price_detail):
+                amount, currency = utils.parse_price_symbol(item["priceString"])
+                c["break_down_description"].append(item["description"])
+                c["break_down_amount"].append(amount)
+                c["break_down_currency"].append(currency)
+                fee_column = fee_columns.get((item["displayComponentType"], item["description"]))
+                if fee_column is not None:
+                    fees[fee_column] = amount
+        for fee_column, amount in fees.items():
+            c[fee_column].append(amount)
+        columns.close_children()
+    return columns
         
 
 def from_details(meta):
     ev = meta["data"]["presentation"]["stayProductDetailPage"]["sections"]["metadata"]["loggingContext"]["eventDataLogging"]
     data = {
         "coordinates": {
-                "latitude":         utils.get_nested_value(ev,"listingLat",0),
-                "longitude":        utils.get_nested_value(ev,"listingLng",0),
+                "latitude":         event_data_paths["latitude"](ev),
+                "longitude":        event_data_paths["longitude"](ev),
         },
-        "room_type":                utils.get_nested_value(ev,"roomType",""),
-        "is_super_host":            utils.get_nested_value(ev,"isSuperhost",""),
-        "home_tier":                utils.get_nested_value(ev,"homeTier",""),
-        "person_capacity":          utils.get_nested_value(ev,"personCapacity",0),
+        "room_type":                event_data_paths["room_type"](ev),
+        "is_super_host":            event_data_paths["is_super_host"](ev),
+        "home_tier":                event_data_paths["home_tier"](ev),
+        "person_capacity":          event_data_paths["person_capacity"](ev),
         "rating":{
-            "accuracy":             utils.get_nested_value(ev,"accuracyRating",0),
-            "checking":             utils.get_nested_value(ev,"checkinRating",0),
-            "cleanliness":          utils.get_nested_value(ev,"cleanlinessRating",0),
-            "communication":        utils.get_nested_value(ev,"communicationRating",0),
-            "location":             utils.get_nested_value(ev,"locationRating",0),
-            "value":                utils.get_nested_value(ev,"valueRating",0),
-            "guest_satisfaction":   utils.get_nested_value(ev,"guestSatisfactionOverall",0),
-            "review_count":         utils.get_nested_value(ev,"visibleReviewCount",0),
+            "accuracy":             event_data_paths["accuracy"](ev),
+            "checking":             event_data_paths["checking"](ev),
+            "cleanliness":          event_data_paths["cleanliness"](ev),
+            "communication":        event_data_paths["communication"](ev),
+            "location":             event_data_paths["location"](ev),
+            "value":                event_data_paths["value"](ev),
+            "guest_satisfaction":   event_data_paths["guest_satisfaction"](ev),
+            "review_count":         event_data_paths["review_count"](ev),
         },
         "house_rules":{
             "aditional":"",
@@ -154,70 +315,70 @@ def from_details(meta):
     }
     data["is_guest_favorite"] = False
 
-    sections = utils.get_nested_value(meta,"data.presentation.stayProductDetailPage.sections.sections",[])
+    sections = sections_path(meta)
     for section in sections:
         if "section" in section:
-            section_data = utils.get_nested_value(section,"section",{})
+            section_data = section_path(section)
             if "isGuestFavorite" in section_data:
                 data["is_guest_favorite"] = section_data["isGuestFavorite"]
 
 
-    sd = utils.get_nested_value(meta,"data.presentation.stayProductDetailPage.sections.sbuiData")
-    for section in utils.get_nested_value(sd,"sectionConfiguration.root.sections",[]):
-        typeName=utils.get_nested_value(section,"sectionData.__typename","")
+    sd = sbui_data_path(meta)
+    for section in sbui_sections_path(sd):
+        typeName=section_data_type_path(section)
         if typeName == "PdpHostOverviewDefaultSection":
             data["host"]={
-                "id" :  utils.get_nested_value(section,"sectionData.hostAvatar.loggingEventData.eventData.pdpContext.hostId",""),
-                "name": utils.get_nested_value(section,"sectionData.title",""),
+                "id" :  section_data_host_id_path(section),
+                "name": section_data_title_path(section),
             }
         elif typeName == "PdpOverviewV2Section":
-            data["sub_description"]["title"]=utils.get_nested_value(section,"sectionData.title","")
-            for item in utils.get_nested_value(section,"sectionData.overviewItems",[]):
-                data["sub_description"]["items"].append(utils.get_nested_value(item,"title",""))
+            data["sub_description"]["title"]=section_data_title_path(section)
+            for item in overview_items_path(section):
+                data["sub_description"]["items"].append(title_path(item))
 
-    for section in utils.get_nested_value(meta,"data.presentation.stayProductDetailPage.sections.sections",[]):
-        typeName=utils.get_nested_value(section,"section.__typename","")
+    for section in sections_path(meta):
+        typeName=section_type_path(section)
         match typeName:
             case "HostProfileSection": 
-                data["host"]["id"] = utils.get_nested_value(section,"section.hostAvatar.userID","")
-                data["host"]["name"] = utils.get_nested_value(section,"section.title","")
-                data["host"]["joined_on"] = utils.get_nested_value(section,"section.subtitle","")
-                data["host"]["description"] = utils.get_nested_value(section,"section.hostProfileDescription.htmlText","")
-                for cohost in utils.get_nested_value(section,"section.additionalHosts",[]):
+                data["host"]["id"] = host_user_id_path(section)
+                data["host"]["name"] = section_title_path(section)
+                data["host"]["joined_on"] = section_subtitle_path(section)
+                data["host"]["description"] = host_description_path(section)
+                for cohost in additional_hosts_path(section):
                     data["co_hosts"].append({"id":cohost.get("id",""),"name":cohost.get("name","")})
             case "PhotoTourModalSection":  
-                for mediaItem in utils.get_nested_value(section,"section.mediaItems",[]):
+                for mediaItem in media_items_path(section):
                     img={
                         "title": mediaItem.get("accessibilityLabel",""),
                         "url": mediaItem.get("baseUrl",""),
                     }
                     data["images"].append(img)
             case "PoliciesSection":        
-                for houseRulesSection in utils.get_nested_value(section,"section.houseRulesSections",[]):
+                for houseRulesSection in house_rules_sections_path(section):
                     house_rule={
                         "title": houseRulesSection.get("title",""),
                         "values":[],
                     }
                     for item in houseRulesSection.get("items",[]):
                             if item.get("title","")=="Additional rules":
-                                data["house_rules"]["aditional"]=utils.get_nested_value(item,"html.htmlText","")
+                                data["house_rules"]["aditional"]=html_text_path(item)
                                 continue
                             house_rule["values"].append({"title":item.get("title","") ,"icon": item.get("icon","")})
 
                     data["house_rules"]["general"].append(house_rule)
             case "LocationSection":
-                for locationDetail in utils.get_nested_value(section,"section.seeAllLocationDetails",[]):
+                for locationDetail in location_details_path(section):
                     seeAllLocationDetail={
                         "title": locationDetail.get("title",""),
-                        "content": utils.get_nested_value(locationDetail,"content.htmlText"),
+                        "content": content_html_text_path(locationDetail),
                     }
                     data["location_descriptions"].append(seeAllLocationDetail)
             case "PdpTitleSection":
                     data["title"]=section.get("title","")
                     if data["title"]=="":
-                        data["title"]=utils.get_nested_value(section,"section.title",[])
+                        data["title"]=section_title_path(section, [])
             case "PdpHighlightsSection":
-                for highlitingData in utils.get_nested_value(section,"section.highlights",[]):
+                for highlitingData in highlights_path(section):
                     highliting={
                         "title": highlitingData.get("title",""),
                         "subtitle": highlitingData.get("subtitle",""),
@@ -225,9 +386,9 @@ def from_details(meta):
                     }
                     data["highlights"].append(highliting)
             case "PdpDescriptionSection":
-                data["description"]=  utils.get_nested_value(section,"section.htmlDescription.htmlText","")
+                data["description"]=  html_description_path(section)
             case "AmenitiesSection":  
-                for amenityGroupRaw in utils.get_nested_value(section,"section.seeAllAmenitiesGroups",[]):
+                for amenityGroupRaw in amenities_groups_path(section):
                     amenityGroup={
                         "title": amenityGroupRaw.get("title",""),
                         "values": [],
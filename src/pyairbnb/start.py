@@ -8,10 +8,16 @@ import pyairbnb.standardize as standardize
 import pyairbnb.experience as experience
 import pyairbnb.calendarinfo as calendar
 import pyairbnb.host_details as host_details
+import pyairbnb.tiles as tiles
+from pyairbnb.client import Client, get_client
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
+import time
 from urllib.parse import urlparse
 
-def get_calendar(api_key: str = "", room_id: str = "", proxy_url: str = ""):
+detail_sections = ("reviews", "calendar", "price", "host_details")
+
+def get_calendar(api_key: str = "", room_id: str = "", proxy_url: str = "", client: Client = None):
     """
     Retrieves the calendar data for a specified room.
 
@@ -19,18 +25,21 @@ def get_calendar(api_key: str = "", room_id: str = "", proxy_url: str = ""):
         room_id (str): The room ID.
         api_key (str): The API key.
         proxy_url (str): The proxy URL.
+        client (Client): Reusable client, a shared one for proxy_url is used when empty.
 
     Returns:
         dict: Calendar data.
     """
-    if not api_key:
-        api_key = api.get(proxy_url)
-
     current_month = datetime.now().month
     current_year = datetime.now().year
-    return calendar.get(api_key, room_id, current_month, current_year, proxy_url)
+    if api_key:
+        return calendar.get(api_key, room_id, current_month, current_year, proxy_url, client)
+    return api.key_cache.call(
+        lambda api_key: calendar.get(api_key, room_id, current_month, current_year, proxy_url, client),
+        proxy_url, client
+    )
 
-def get_reviews(room_url: str ,language: str = "en", proxy_url: str = ""):
+def get_reviews(room_url: str ,language: str = "en", proxy_url: str = "", client: Client = None):
     """
     Retrieves review data for a specified product.
 
@@ -39,17 +48,19 @@ def get_reviews(room_url: str ,language: str = "en", proxy_url: str = ""):
         proxy_url (str): The proxy URL.
         language (str): The language (default is 'en').
         currency (str): The currency (default is 'USD').
+        client (Client): Reusable client, a shared one for proxy_url is used when empty.
 
     Returns:
         dict: Reviews data.
     """
-    data, price_input, cookies = details.get(room_url, language, proxy_url)
+    data, price_input, cookies = details.get(room_url, language, proxy_url, client)
     product_id = price_input["product_id"]
     api_key = price_input["api_key"]
 
-    return reviews.get(api_key, product_id, "USD", language, proxy_url)
+    return reviews.get(api_key, product_id, "USD", language, proxy_url, client)
 
-def get_details(room_url: str = None, room_id: int = None, domain: str = "www.airbnb.com", check_in: str = None, check_out: str = None, adults: int = 1, currency: str = "USD", language: str = "en", proxy_url: str = ""):
+def get_details(room_url: str = None, room_id: int = None, domain: str = "www.airbnb.com", check_in: str = None, check_out: str = None, adults: int = 1, currency: str = "USD", language: str = "en", proxy_url: str = "", client: Client = None,
+                sections: list = detail_sections):
     """
     Retrieves all details (calendar, reviews, price, and host details) for a specified room.
 
@@ -62,9 +73,12 @@ def get_details(room_url: str = None, room_id: int = None, domain: str = "www.ai
         check_out (str): Check-out date for price information.
         language (str): The language (default is 'en').
         proxy_url (str): Proxy URL.
+        client (Client): Reusable client, a shared one for proxy_url is used when empty.
+        sections (list): Sections to fetch besides the room page, any of "reviews", "calendar", "price" and "host_details".
 
     Returns:
-        dict: A dictionary with all room details.
+        dict: A dictionary with all room details, "timings" holds the seconds spent on each
+        section and in total.
     """
     if not room_url and room_id is None:
         raise ValueError("Either room_url or room_id must be provided.")
@@ -72,8 +86,19 @@ def get_details(room_url: str = None, room_id: int = None, domain: str = "www.ai
     if not room_url:
         room_url = f"https://{domain}/rooms/{room_id}"
     
-    data, price_input, cookies = details.get(room_url, language, proxy_url)
+    client = get_client(client, proxy_url)
+    return fetch_details(room_url, room_id, check_in, check_out, adults, currency, language, proxy_url, client, sections, client.get_executor())
+
+def fetch_details(room_url: str, room_id, check_in: str, check_out: str, adults: int, currency: str, language: str, proxy_url: str, client: Client,
+                  sections: list, executor: ThreadPoolExecutor = None):
+    """
+    Body of get_details. The sections run concurrently on executor, or one after the other in
+    the calling thread when it is None.
+    """
+    started_at = time.perf_counter()
+    (data, price_input, cookies), details_time = utils.timed(details.get, room_url, language, proxy_url, client)
     product_id = price_input["product_id"]
+    # The page already embeds a valid API key, reuse it for every other call
     api_key = price_input["api_key"]
     
     # Extract room_id from URL if not provided
@@ -82,26 +107,87 @@ def get_details(room_url: str = None, room_id: int = None, domain: str = "www.ai
         path = parsed_url.path
         room_id = path.split("/")[-1]
     
-    # Get calendar and reviews data
-    data["reviews"] = reviews.get(api_key, product_id, currency, language, proxy_url)
-    data["calendar"] = get_calendar(api_key, room_id, proxy_url)
-    
+    # Reviews, calendar, price and host details only depend on the page, fetch them concurrently
+    # when there is an executor
+    host_id = data["host"]["id"]
+    calls = {}
+    if "reviews" in sections:
+        calls["reviews"] = (reviews.get, api_key, product_id, currency, language, proxy_url, client)
+    if "calendar" in sections:
+        calls["calendar"] = (get_calendar, api_key, room_id, proxy_url, client)
+    if "host_details" in sections:
+        calls["host_details"] = (host_details.get, api_key, cookies, host_id, language, proxy_url, client)
     # Get price data if check-in and check-out dates are provided
-    if check_in and check_out:
-        price_data = price.get(
-            api_key, cookies, price_input["impression_id"], product_id, check_in, check_out, adults, 
-            currency, language, proxy_url
+    if "price" in sections and check_in and check_out:
+        calls["price"] = (
+            price.get, api_key, cookies, price_input["impression_id"], product_id, check_in, check_out, adults,
+            currency, language, proxy_url, client
         )
-        data["price"] = price_data
-    
-    # Get host details
-    host_id = data["host"]["id"]
-    data["host_details"] = host_details.get(api_key, cookies, host_id, language, proxy_url)
+    timings = {"details": details_time}
+    if executor is None:
+        for name, call in calls.items():
+            data[name], timings[name] = utils.timed(*call)
+    else:
+        futures = {name: executor.submit(utils.timed, *call) for name, call in calls.items()}
+        for name, future in futures.items():
+            data[name], timings[name] = future.result()
+    timings["total"] = time.perf_counter() - started_at
+    data["timings"] = timings
     
     return data
 
+def get_details_many(room_ids, concurrency: int = 16, sections: list = detail_sections, domain: str = "www.airbnb.com", check_in: str = None, check_out: str = None,
+                     adults: int = 1, currency: str = "USD", language: str = "en", proxy_url: str = "", client: Client = None):
+    """
+    Retrieves the details of many rooms with a bounded pool of workers, yielding every room as soon
+    as it is done. A failing room doesn't stop the batch, its error is yielded instead.
+
+    Args:
+        room_ids (iterable): Room IDs, for example the room_id of every search_all result.
+        concurrency (int): Number of rooms fetched at the same time.
+        sections (list): Sections to fetch besides the room page, any of "reviews", "calendar", "price" and "host_details".
+        domain (str): The domain (default is 'www.airbnb.com').
+        check_in (str): Check-in date for price information.
+        check_out (str): Check-out date for price information.
+        adults (int): Number of adults for price information.
+        currency (str): Currency for pricing information.
+        language (str): The language (default is 'en').
+        proxy_url (str): Proxy URL.
+        client (Client): Reusable client, a shared one for proxy_url is used when empty.
+
+    Yields:
+        tuple: (room_id, data, error), data is None when error is set.
+    """
+    client = get_client(client, proxy_url)
+
+    def fetch(room_id):
+        # The sections of a room run one after the other on the worker thread, the pool
+        # already keeps `concurrency` requests in flight and its threads keep their connections
+        room_url = f"https://{domain}/rooms/{room_id}"
+        return fetch_details(room_url, room_id, check_in, check_out, adults, currency, language, proxy_url, client, sections)
+
+    room_ids = iter(room_ids)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = {}
+        while True:
+            # Keep at most two rooms per worker queued so huge id lists are consumed lazily
+            for room_id in room_ids:
+                pending[executor.submit(fetch, room_id)] = room_id
+                if len(pending) >= concurrency * 2:
+                    break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                room_id = pending.pop(future)
+                error = future.exception()
+                if error is not None:
+                    yield room_id, None, error
+                else:
+                    yield room_id, future.result(), None
+
 def search_all(check_in: str, check_out: str, ne_lat: float, ne_long: float, sw_lat: float, sw_long: float,
-               zoom_value: int, price_min: int, price_max: int, place_type: str = "", amenities: list = [], currency: str = "USD", language: str = "en", proxy_url: str = ""):
+               zoom_value: int, price_min: int, price_max: int, place_type: str = "", amenities: list = [], currency: str = "USD", language: str = "en", proxy_url: str = "", client: Client = None):
     """
     Performs a paginated search for all rooms within specified geographic bounds.
 
@@ -117,27 +203,140 @@ def search_all(check_in: str, check_out: str, ne_lat: float, ne_long: float, sw_
         amenities (list): List of amenity IDs to filter
         language (str): language to use for example en,es,tr ..etc
         proxy_url (str): Proxy URL.
+        client (Client): Reusable client, a shared one for proxy_url is used when empty.
 
     Returns:
         list: A list of all search results.
+
+    Raises:
+        PartialResultsError: When a page fails after others were fetched, its results hold
+        the listings of the pages fetched so far.
     """
-    api_key = api.get(proxy_url)
     all_results = []
-    cursor = ""
-    while True:
-        results_raw = search.get(
-            api_key, cursor, check_in, check_out, ne_lat, ne_long, sw_lat, sw_long, zoom_value, 
-            currency, place_type, price_min, price_max, amenities, language, proxy_url
-        )
-        results = standardize.from_search(results_raw.get("searchResults", []))
-        all_results.extend(results)
-        if not results or "nextPageCursor" not in results_raw["paginationInfo"] or results_raw["paginationInfo"]["nextPageCursor"] is None:
-            break
-        cursor = results_raw["paginationInfo"]["nextPageCursor"]
+    try:
+        for result in iter_search(
+            check_in, check_out, ne_lat, ne_long, sw_lat, sw_long, zoom_value, price_min, price_max,
+            place_type, amenities, currency, language, proxy_url, client, prefetch=False
+        ):
+            all_results.append(result)
+    except Exception as e:
+        if not all_results:
+            raise
+        raise utils.PartialResultsError(e, all_results) from e
     return all_results
 
+def iter_search(check_in: str, check_out: str, ne_lat: float, ne_long: float, sw_lat: float, sw_long: float,
+                zoom_value: int, price_min: int, price_max: int, place_type: str = "", amenities: list = [], currency: str = "USD", language: str = "en", proxy_url: str = "", client: Client = None,
+                prefetch: bool = True):
+    """
+    Streaming version of search_all: yields the standardized listings of each page as soon as
+    the page arrives, so only one or two pages are held in memory.
+
+    Args:
+        check_in (str): Check-in date.
+        check_out (str): Check-out date.
+        ne_lat (float): Latitude of northeast corner.
+        ne_long (float): Longitude of northeast corner.
+        sw_lat (float): Latitude of southwest corner.
+        sw_long (float): Longitude of southwest corner.
+        zoom_value (int): Zoom level.
+        currency (str): Currency for pricing information.
+        amenities (list): List of amenity IDs to filter
+        language (str): language to use for example en,es,tr ..etc
+        proxy_url (str): Proxy URL.
+        client (Client): Reusable client, a shared one for proxy_url is used when empty.
+        prefetch (bool): Fetches the next page in a background thread while the listings of
+            the current one are consumed.
+
+    Yields:
+        dict: Standardized listings, in the order of the pages.
+
+    Raises:
+        Exception: The error of the page that failed, after the listings of the previous pages were yielded.
+    """
+    def fetch_page(cursor):
+        return api.key_cache.call(
+            lambda api_key: search.get(
+                api_key, cursor, check_in, check_out, ne_lat, ne_long, sw_lat, sw_long, zoom_value, 
+                currency, place_type, price_min, price_max, amenities, language, proxy_url, client
+            ),
+            proxy_url, client
+        )
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        results_raw = fetch_page("")
+        while True:
+            results = standardize.from_search(results_raw.get("searchResults", []))
+            cursor = results_raw["paginationInfo"].get("nextPageCursor")
+            if not results or cursor is None:
+                yield from results
+                return
+            next_page = executor.submit(fetch_page, cursor) if executor else None
+            yield from results
+            results_raw = next_page.result() if next_page else fetch_page(cursor)
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def search_all_tiled(check_in: str, check_out: str, ne_lat: float, ne_long: float, sw_lat: float, sw_long: float,
+               zoom_value: int, price_min: int, price_max: int, place_type: str = "", amenities: list = [], currency: str = "USD", language: str = "en", proxy_url: str = "", client: Client = None,
+               saturation_threshold: int = 270, max_depth: int = 6, max_workers: int = 8):
+    """
+    Searches a large bounding box by splitting it into quadrants whenever a tile hits airbnb's
+    per query result cap. Tiles of the same level are searched concurrently.
+
+    Args:
+        check_in (str): Check-in date.
+        check_out (str): Check-out date.
+        ne_lat (float): Latitude of northeast corner.
+        ne_long (float): Longitude of northeast corner.
+        sw_lat (float): Latitude of southwest corner.
+        sw_long (float): Longitude of southwest corner.
+        zoom_value (int): Zoom level of the whole box, increased by one on every split.
+        currency (str): Currency for pricing information.
+        amenities (list): List of amenity IDs to filter
+        language (str): language to use for example en,es,tr ..etc
+        proxy_url (str): Proxy URL.
+        client (Client): Reusable client, a shared one for proxy_url is used when empty.
+        saturation_threshold (int): Number of listings from which a tile is considered truncated.
+        max_depth (int): Maximum number of splits of the original box.
+        max_workers (int): Number of tiles searched at the same time.
+
+    Returns:
+        tuple: The search results deduplicated by room_id, and a dict with the coverage stats
+        (tiles_searched, saturated_tiles, saturated_tiles_at_max_depth, max_depth_reached,
+        listings_fetched, unique_listings, failed_tiles).
+
+    Raises:
+        PartialResultsError: When some tiles failed, its results hold the tuple above for the
+        tiles that succeeded.
+    """
+    def search_tile(tile):
+        return search_all(
+            check_in, check_out, tile["ne_lat"], tile["ne_long"], tile["sw_lat"], tile["sw_long"], tile["zoom_value"],
+            price_min, price_max, place_type, amenities, currency, language, proxy_url, client
+        )
+
+    coverage = tiles.Coverage(saturation_threshold, max_depth)
+    level = [tiles.new_tile(ne_lat, ne_long, sw_lat, sw_long, zoom_value)]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while level:
+            next_level = []
+            futures = [executor.submit(search_tile, tile) for tile in level]
+            for tile, future in zip(level, futures):
+                error = future.exception()
+                if error is not None:
+                    coverage.fail(tile, error)
+                    continue
+                next_level.extend(coverage.add(tile, future.result()))
+            level = next_level
+    if coverage.errors:
+        raise utils.PartialResultsError(coverage.errors[0], (coverage.results(), coverage.stats)) from coverage.errors[0]
+    return coverage.results(), coverage.stats
+
 def search_first_page(check_in: str, check_out: str, ne_lat: float, ne_long: float, sw_lat: float, sw_long: float,
-               zoom_value: int, price_min: int, price_max: int, place_type: str = "", amenities: list = [], currency: str = "USD", language: str = "en", proxy_url: str = ""):
+               zoom_value: int, price_min: int, price_max: int, place_type: str = "", amenities: list = [], currency: str = "USD", language: str = "en", proxy_url: str = "", client: Client = None):
     """
     Searches the first page of results within specified geographic bounds.
 
@@ -153,22 +352,25 @@ def search_first_page(check_in: str, check_out: str, ne_lat: float, ne_long: flo
         amenities (list): List of amenity IDs to filter
         language (str): language to use for example en,es,tr ..etc
         proxy_url (str): Proxy URL.
+        client (Client): Reusable client, a shared one for proxy_url is used when empty.
 
     Returns:
         list: A list of search results from the first page.
     """
-    api_key = api.get(proxy_url)
-    results_raw = search.get(
+    results_raw = api.key_cache.call(
+        lambda api_key: search.get(
             api_key, "", check_in, check_out, ne_lat, ne_long, sw_lat, sw_long, zoom_value, 
-            currency, place_type, price_min, price_max, amenities, language, proxy_url
+            currency, place_type, price_min, price_max, amenities, language, proxy_url, client
+        ),
+        proxy_url, client
     )
 
     results = standardize.from_search(results_raw.get("searchResults", []))
     return results
 
 
-def search_experience_by_taking_the_first_inputs_i_dont_care(user_input_text: str, currency:str, locale: str, check_in:str, check_out:str, api_key:str, proxy_url:str):
-    markets_data = search.get_markets(currency,locale,api_key,proxy_url)
+def search_experience_by_taking_the_first_inputs_i_dont_care(user_input_text: str, currency:str, locale: str, check_in:str, check_out:str, api_key:str, proxy_url:str, client: Client = None):
+    markets_data = search.get_markets(currency,locale,api_key,proxy_url,client)
     markets = utils.get_nested_value(markets_data,"user_markets", [])
     if len(markets)==0:
         raise Exception("markets are empty")
@@ -176,22 +378,25 @@ def search_experience_by_taking_the_first_inputs_i_dont_care(user_input_text: st
     country_code = utils.get_nested_value(markets[0],"country_code", "")
     if config_token=="" or country_code=="":
         raise Exception("config_token or country_code are empty")
-    place_ids_results = search.get_places_ids(country_code, user_input_text, currency, locale, config_token, api_key, proxy_url)
+    place_ids_results = search.get_places_ids(country_code, user_input_text, currency, locale, config_token, api_key, proxy_url, client)
     if len(place_ids_results)==0:
         raise Exception("empty places ids")
     place_id = utils.get_nested_value(place_ids_results[0],"location.google_place_id", "")
     location_name = utils.get_nested_value(place_ids_results[0],"location.location_name", "")
     if place_id=="" or location_name=="":
         raise Exception("place_id or location_name are empty")
-    [result,cursor] = experience.search_by_place_id("", place_id, location_name, currency, locale, check_in, check_out, api_key, proxy_url)
+    [result,cursor] = experience.search_by_place_id("", place_id, location_name, currency, locale, check_in, check_out, api_key, proxy_url, client)
     while cursor!="":
-        [result_tmp,cursor] = experience.search_by_place_id(cursor, place_id, location_name, currency, locale, check_in, check_out, api_key, proxy_url)
+        try:
+            [result_tmp,cursor] = experience.search_by_place_id(cursor, place_id, location_name, currency, locale, check_in, check_out, api_key, proxy_url, client)
+        except Exception as e:
+            raise utils.PartialResultsError(e, result) from e
         if len(result_tmp)==0:
             break
         result = result + result_tmp
     return result
 
-def search_all_from_url(url: str, currency: str = "USD", language: str = "en", proxy_url: str = ""):
+def search_all_from_url(url: str, currency: str = "USD", language: str = "en", proxy_url: str = "", client: Client = None):
     """
     Wrapper that parses an Airbnb search URL and delegates to search_all.
     """
@@ -241,5 +446,6 @@ def search_all_from_url(url: str, currency: str = "USD", language: str = "en", p
         amenities=amenities,
         currency=currency,
         language=language,
-        proxy_url=proxy_url
+        proxy_url=proxy_url,
+        client=client
     )
\ No newline at end of file
@@ -0,0 +1,88 @@
+import pyairbnb.utils as utils
+
+max_zoom = 20
+
+
+def split(tile: dict) -> list:
+    """
+    Splits a bounding box tile into its four quadrants, one zoom level deeper.
+    """
+    mid_lat = (tile["ne_lat"] + tile["sw_lat"]) / 2
+    mid_long = (tile["ne_long"] + tile["sw_long"]) / 2
+    zoom_value = min(tile["zoom_value"] + 1, max_zoom)
+    depth = tile["depth"] + 1
+    return [
+        new_tile(tile["ne_lat"], tile["ne_long"], mid_lat, mid_long, zoom_value, depth),
+        new_tile(tile["ne_lat"], mid_long, mid_lat, tile["sw_long"], zoom_value, depth),
+        new_tile(mid_lat, tile["ne_long"], tile["sw_lat"], mid_long, zoom_value, depth),
+        new_tile(mid_lat, mid_long, tile["sw_lat"], tile["sw_long"], zoom_value, depth),
+    ]
+
+def new_tile(ne_lat: float, ne_long: float, sw_lat: float, sw_long: float, zoom_value: int, depth: int = 0) -> dict:
+    return {
+        "ne_lat": ne_lat,
+        "ne_long": ne_long,
+        "sw_lat": sw_lat,
+        "sw_long": sw_long,
+        "zoom_value": zoom_value,
+        "depth": depth,
+    }
+
+
+class Coverage:
+    """
+    Merges the listings of every searched tile, deduplicated by room_id, and decides which
+    tiles have to be split because they hit the per query result cap.
+
+    Args:
+        saturation_threshold (int): A tile returning at least this many listings is considered
+            truncated by airbnb and is searched again as four smaller tiles.
+        max_depth (int): Maximum number of times the original box is split.
+    """
+
+    def __init__(self, saturation_threshold: int, max_depth: int):
+        self.saturation_threshold = saturation_threshold
+        self.max_depth = max_depth
+        self.rooms = {}
+        self.stats = {
+            "tiles_searched": 0,
+            "saturated_tiles": 0,
+            "saturated_tiles_at_max_depth": 0,
+            "max_depth_reached": 0,
+            "listings_fetched": 0,
+            "unique_listings": 0,
+            "failed_tiles": 0,
+        }
+        self.errors = []
+
+    def add(self, tile: dict, results: list) -> list:
+        """
+        Records the listings of a searched tile and returns the tiles that still need to be searched.
+        """
+        self.stats["tiles_searched"] += 1
+        self.stats["listings_fetched"] += len(results)
+        self.stats["max_depth_reached"] = max(self.stats["max_depth_reached"], tile["depth"])
+        for result in results:
+            self.rooms.setdefault(result["room_id"], result)
+        self.stats["unique_listings"] = len(self.rooms)
+        if len(results) < self.saturation_threshold:
+            return []
+        self.stats["saturated_tiles"] += 1
+        if tile["depth"] >= self.max_depth:
+            self.stats["saturated_tiles_at_max_depth"] += 1
+            return []
+        return split(tile)
+
+    def fail(self, tile: dict, error: Exception):
+        """
+        Records a tile whose search failed, keeping the listings it collected before the failure.
+        """
+        self.stats["failed_tiles"] += 1
+        self.errors.append(error)
+        if isinstance(error, utils.PartialResultsError):
+            for result in error.results:
+                self.rooms.setdefault(result["room_id"], result)
+            self.stats["unique_listings"] = len(self.rooms)
+
+    def results(self) -> list:
+        return list(self.rooms.values())
@@ -1,4 +1,5 @@
 import re
+import time
 from urllib.parse import quote
 
 
@@ -8,6 +9,11 @@ regx_price = re.compile(r'\d+')
 def remove_space(value:str):
     return regex_space.sub(' ', value.strip())
 
+def timed(function, *args):
+    started_at = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started_at
+
 def get_nested_value(dic, key_path, default=None):
     keys = key_path.split(".")
     current = dic
@@ -17,6 +23,73 @@ def get_nested_value(dic, key_path, default=None):
             return default
     return current
 
+missing = object()
+
+class NestedPath:
+    """
+    Precompiled version of get_nested_value for paths read in loops: the dotted path is
+    split once into a tuple of keys.
+
+    Calling it returns the value at the path, or the default when a key is missing, a value
+    on the way is not a dict, or the value is None or an empty dict. Other falsy values
+    like 0, False, "" or [] are returned as they are.
+
+    Example:
+        latitude = NestedPath("coordinate.latitude", 0)
+        latitude(listing)
+    """
+
+    __slots__ = ("keys", "default")
+
+    def __init__(self, key_path: str, default=None):
+        self.keys = tuple(key_path.split("."))
+        self.default = default
+
+    def __call__(self, dic, default=missing):
+        current = dic
+        for key in self.keys:
+            if current.__class__ is not dict:
+                current = None
+                break
+            current = current.get(key)
+            if current is None:
+                break
+        if current is None or (current.__class__ is dict and not current):
+            return self.default if default is missing else default
+        return current
+
+def get_proxies(proxy_url: str):
+    if not proxy_url:
+        return {}
+    return {"http": proxy_url, "https": proxy_url}
+
+class StatusCodeError(Exception):
+    def __init__(self, *args, status_code: int = 0, response=None):
+        super().__init__(*args)
+        self.status_code = status_code
+        self.response = response
+
+class PartialResultsError(Exception):
+    """
+    Raised when a paginated fetch fails after some pages were already collected. `results`
+    holds what was collected before the failure and `error` the exception that stopped it.
+    """
+    def __init__(self, error: Exception, results):
+        super().__init__(f"stopped by {type(error).__name__}: {error}, partial results kept in .results")
+        self.error = error
+        self.results = results
+
+def check_status(response):
+    if response.status_code != 200:
+        raise StatusCodeError("Not corret status code: ", response.status_code, " response body: ",response.text, status_code=response.status_code, response=response)
+
+def get_status_code(error: Exception) -> int:
+    status_code = getattr(error, "status_code", None)
+    if status_code:
+        return status_code
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", 0) or 0
+
 def parse_price_symbol(price_raw: str):
     price_raw = price_raw.replace(",", "")
 
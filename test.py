@@ -1,5 +1,4 @@
 import pyairbnb
-import json
 import os
 import datetime
 
@@ -43,27 +42,27 @@ currency = currency
 language = "en"
 proxy_url = ""
 
-search_results = pyairbnb.search_all(
-    check_in=check_in,
-    check_out=check_out,
-    ne_lat=ne_lat,
-    ne_long=ne_long,
-    sw_lat=sw_lat,
-    sw_long=sw_long,
-    zoom_value=zoom_value,
-    price_min=price_min,
-    price_max=price_max,
-    place_type=place_type,
-    amenities=amenities,
-    currency=currency,
-    language=language,
-    proxy_url=proxy_url
-)
-
 ## take the current date and time for the filename
 current_time = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-# Save the search results to a JSON file with a timestamp
-with open(f'results/search_results_{current_time}.json', 'w', encoding='utf-8') as f:
-    f.write(json.dumps(search_results, indent=4))  # Convert results to JSON and write to files
+# Stream the search results to a gzipped JSON lines file with a timestamp, page by page
+with pyairbnb.JsonlWriter(f'results/search_results_{current_time}.jsonl.gz') as writer:
+    for room in pyairbnb.iter_search(
+        check_in=check_in,
+        check_out=check_out,
+        ne_lat=ne_lat,
+        ne_long=ne_long,
+        sw_lat=sw_lat,
+        sw_long=sw_long,
+        zoom_value=zoom_value,
+        price_min=price_min,
+        price_max=price_max,
+        place_type=place_type,
+        amenities=amenities,
+        currency=currency,
+        language=language,
+        proxy_url=proxy_url
+    ):
+        # the stay window is kept with each listing for the price history of postgres_db.py
+        writer.write(dict(room, check_in=check_in, check_out=check_out))
 
-print(f"Retrieved {len(search_results)} listings from search.")
\ No newline at end of file
+print(f"Retrieved {writer.count} listings from search.")
\ No newline at end of file
@@ -1,6 +1,5 @@
 import datetime
 import pyairbnb
-import json
 
 # Define search parameters
 currency = "USD"  # Currency for the search in the US
@@ -23,8 +22,8 @@ language = "en"  # Use English for results
 proxy_url = ""  # Optional proxy
 
 
-# Search listings within specified coordinates and date range using keyword arguments
-search_results = pyairbnb.search_all(
+# A state sized box goes over airbnb's per query result cap, so search it in tiles
+search_results, coverage = pyairbnb.search_all_tiled(
     check_in=check_in,
     check_out=check_out,
     ne_lat=ne_lat,
@@ -43,8 +42,10 @@ search_results = pyairbnb.search_all(
 
 ## take the current date and time for the filename
 current_time = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-# Save the search results to a JSON file with a timestamp
-with open(f'results/search_results_{current_time}.json', 'w', encoding='utf-8') as f:
-    f.write(json.dumps(search_results, indent=4))  # Convert results to JSON and write to files
+# Save the search results to a gzipped JSON lines file with a timestamp
+with pyairbnb.JsonlWriter(f'results/search_results_{current_time}.jsonl.gz') as writer:
+    # the stay window is kept with each listing for the price history of postgres_db.py
+    writer.write_many(dict(room, check_in=check_in, check_out=check_out) for room in search_results)
 
-print(f"Retrieved {len(search_results)} listings from search.")
\ No newline at end of file
+print(f"Retrieved {len(search_results)} listings from search.")
+print(f"Coverage: {coverage}")
\ No newline at end of file
@@ -0,0 +1,41 @@
+import json
+import random
+import pytest
+import pyairbnb.jsonl as jsonl
+
+
+def read_array(tmp_path, text: str, chunk_size: int) -> list:
+    path = tmp_path / "array.json"
+    path.write_text(text, encoding="utf-8")
+    return list(jsonl.read_array(str(path), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 7, 64, 4096])
+@pytest.mark.parametrize("text", [
+    "[]",
+    " [ ] \n",
+    "[1, 2.5, 3e2, -4, 5]",
+    '[{"a": [1, 2.25, {"b": "c,]"}]}, null, true, "x"]',
+    json.dumps([random.Random(seed).random() * 10 ** seed for seed in range(50)], indent=2),
+    "[1,]",
+    "[,1]",
+    "[1 2]",
+    "[1,,2]",
+    "[1",
+    "[1]x",
+    "[1][2]",
+    "[1] ,",
+    "{}",
+])
+def test_read_array_matches_json_loads(tmp_path, text, chunk_size):
+    try:
+        expected = json.loads(text)
+    except json.JSONDecodeError:
+        with pytest.raises((json.JSONDecodeError, ValueError)):
+            read_array(tmp_path, text, chunk_size)
+        return
+    if not isinstance(expected, list):
+        with pytest.raises(ValueError):
+            read_array(tmp_path, text, chunk_size)
+        return
+    assert read_array(tmp_path, text, chunk_size) == expected
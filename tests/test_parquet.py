@@ -0,0 +1,48 @@
+import os
+import pytest
+import pyairbnb.parquet as parquet
+import pyairbnb.standardize as standardize
+
+pytest.importorskip("pyarrow")
+
+
+def raw_result(room_id: int, avg_rating: str) -> dict:
+    return {
+        "__typename": "StaySearchResult",
+        "listing": {
+            "id": str(room_id),
+            "roomTypeCategory": "private_room",
+            "pdpUrlType": "ROOMS",
+            "name": "Room",
+            "title": "Room in Berea",
+            "listingObjType": "REGULAR",
+            "coordinate": {"latitude": 41.38202, "longitude": -81.86077},
+            "formattedBadges": [],
+            "avgRatingLocalized": avg_rating,
+            "contextualPictures": [{"picture": "https://a0.muscache.com/im/pictures/1.jpg"}],
+        },
+        "pricingQuote": {"structuredStayDisplayPrice": {
+            "primaryLine": {"qualifier": "for 3 nights", "price": "$291"},
+            "secondaryLine": {"price": "$291 total"},
+            "explanationData": {"priceDetails": [{"items": [
+                {"description": "$97.00 x 3 nights", "priceString": "$291", "displayComponentType": "DEFAULT_EXPLANATION_LINE_ITEM"},
+            ]}]},
+        }},
+    }
+
+
+def test_unrated_listing_matches_between_dict_and_columnar_export():
+    results = [raw_result(1, "New"), raw_result(2, "4,92 (439)")]
+    from_dicts = parquet.search_table(standardize.from_search(results))
+    from_columns = parquet.search_table(standardize.from_search_columnar(results))
+    assert from_dicts.column("rating").to_pylist() == [None, 4.92]
+    assert from_dicts.column("review_count").to_pylist() == [0, 439]
+    assert from_dicts.equals(from_columns)
+
+
+def test_write_partition_returns_the_written_directory(tmp_path):
+    table = parquet.search_table(standardize.from_search([raw_result(1, "4,92 (439)")]))
+    directory = parquet.write_partition(table, str(tmp_path), "New York/NY", "2025-06-21")
+    assert os.path.isdir(directory)
+    assert os.path.basename(directory) == "market=New%20York%2FNY"
+    assert parquet.read(str(tmp_path), market="New York/NY").column("room_id").to_pylist() == [1]